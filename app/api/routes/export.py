@@ -0,0 +1,56 @@
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from app.models import Game, PriceOffer
+from app.services.export import MEDIA_TYPES, ExportFormat, stream_export
+from app.services.game_queries import GameFilters
+
+router = APIRouter(prefix="/export", tags=["Export"])
+
+GAME_COLUMNS = (
+    Game.id, Game.slug, Game.title, Game.description, Game.release_date,
+    Game.publisher_id, Game.developer_id, Game.last_changed_at,
+)
+PRICE_OFFER_COLUMNS = (
+    PriceOffer.id, PriceOffer.game_id, PriceOffer.scraped_at, PriceOffer.original_price_cents,
+    PriceOffer.discounted_price_cents, PriceOffer.currency, PriceOffer.starts_at, PriceOffer.ends_at,
+)
+
+
+def _export_response(stmt, name: str, fmt: ExportFormat, gzip: bool) -> StreamingResponse:
+    headers = {"Content-Disposition": f'attachment; filename="{name}.{fmt}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(stream_export(stmt, fmt, gzip), media_type=MEDIA_TYPES[fmt], headers=headers)
+
+
+@router.get("/games", summary="Stream the whole game catalog")
+async def export_games(
+    format: ExportFormat = Query("ndjson"),
+    gzip: bool = Query(False, description="Compress the stream (Content-Encoding: gzip)"),
+    filters: GameFilters = Depends(),
+):
+    """خروجی کامل کاتالوگ به‌صورت stream؛ حافظه مستقل از اندازهٔ جدول است"""
+    stmt = filters.apply(select(*GAME_COLUMNS)).order_by(Game.id)
+    return _export_response(stmt, "games", format, gzip)
+
+
+@router.get("/price_offers", summary="Stream the price history")
+async def export_price_offers(
+    format: ExportFormat = Query("ndjson"),
+    gzip: bool = Query(False, description="Compress the stream (Content-Encoding: gzip)"),
+    game_id: Optional[int] = Query(None),
+    since: Optional[datetime] = Query(None, description="Only rows scraped at or after this time"),
+):
+    stmt = select(*PRICE_OFFER_COLUMNS)
+    if game_id is not None:
+        stmt = stmt.where(PriceOffer.game_id == game_id)
+    if since is not None:
+        # پارتیشن‌های قدیمی‌تر اصلاً خوانده نمی‌شوند
+        stmt = stmt.where(PriceOffer.scraped_at >= since)
+    stmt = stmt.order_by(PriceOffer.game_id, PriceOffer.scraped_at)
+    return _export_response(stmt, "price_offers", format, gzip)
@@ -0,0 +1,65 @@
+from typing import List
+
+from fastapi import APIRouter, Body, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Game
+from app.schemas.game_links import GameLinksBatchOut, GameLinksIn, GameLinksOut
+from app.services.dimensions import sync_links, unknown_ids
+from app.utils.deps import get_db
+
+# قبل از router بازی‌ها include می‌شود تا /games/genres با /games/{game_id} اشتباه نشود
+router = APIRouter(prefix="/games", tags=["Game Links"])
+
+
+async def _replace(db: AsyncSession, field: str, links: dict[int, set[int]]) -> tuple[int, int]:
+    missing_games = sorted(set(links) - set(
+        (await db.execute(select(Game.id).where(Game.id.in_(list(links))))).scalars().all()
+    ))
+    if missing_games:
+        raise HTTPException(status_code=404, detail={"message": "Game not found", "game_ids": missing_games})
+    missing = await unknown_ids(db, field, {i for ids in links.values() for i in ids})
+    if missing:
+        raise HTTPException(status_code=422, detail={"message": f"Unknown {field}", "ids": missing})
+    added, removed = await sync_links(db, field, links)
+    await db.commit()
+    return added, removed
+
+
+async def _replace_one(db: AsyncSession, field: str, game_id: int, ids: list[int]) -> dict:
+    added, removed = await _replace(db, field, {game_id: set(ids)})
+    return {"game_id": game_id, "ids": sorted(set(ids)), "added": added, "removed": removed}
+
+
+async def _replace_many(db: AsyncSession, field: str, payload: list[GameLinksIn]) -> dict:
+    links: dict[int, set[int]] = {}
+    for item in payload:
+        # اگر یک بازی دو بار آمده باشد، آخرین مقدار برنده است
+        links[item.game_id] = set(item.ids)
+    if not links:
+        return {"games": 0, "added": 0, "removed": 0}
+    added, removed = await _replace(db, field, links)
+    return {"games": len(links), "added": added, "removed": removed}
+
+
+@router.put("/genres", response_model=GameLinksBatchOut, summary="Replace the genre sets of many games")
+async def replace_genres_batch(payload: List[GameLinksIn], db: AsyncSession = Depends(get_db)):
+    return await _replace_many(db, "genres", payload)
+
+
+@router.put("/platforms", response_model=GameLinksBatchOut, summary="Replace the platform sets of many games")
+async def replace_platforms_batch(payload: List[GameLinksIn], db: AsyncSession = Depends(get_db)):
+    return await _replace_many(db, "platforms", payload)
+
+
+@router.put("/{game_id}/genres", response_model=GameLinksOut)
+async def replace_genres(game_id: int, genre_ids: List[int] = Body(...), db: AsyncSession = Depends(get_db)):
+    """مجموعهٔ ژانرهای بازی را با همین لیست جایگزین می‌کند (diff در خود SQL)"""
+    return await _replace_one(db, "genres", game_id, genre_ids)
+
+
+@router.put("/{game_id}/platforms", response_model=GameLinksOut)
+async def replace_platforms(game_id: int, platform_ids: List[int] = Body(...), db: AsyncSession = Depends(get_db)):
+    """مجموعهٔ پلتفرم‌های بازی را با همین لیست جایگزین می‌کند (diff در خود SQL)"""
+    return await _replace_one(db, "platforms", game_id, platform_ids)
@@ -1,92 +1,170 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
-from typing import List, Optional
-
-from app.utils.deps import get_db
-from app.models import Game
-from app.schemas.game import GameCreate, GameUpdate, GameOut
-from app.services.scraper import scrape_and_upsert
-
-router = APIRouter(prefix="/games", tags=["games"])
-
-@router.get("/", response_model=List[GameOut])
-async def list_games(
-    db: AsyncSession = Depends(get_db),
-    limit: int = Query(50, ge=1, le=200),
-    offset: int = Query(0, ge=0),
-):
-    res = await db.execute(select(Game).offset(offset).limit(limit))
-    return res.scalars().all()
-
-@router.get("/{game_id}", response_model=GameOut)
-async def get_game(game_id: int, db: AsyncSession = Depends(get_db)):
-    res = await db.execute(select(Game).where(Game.id == game_id))
-    game = res.scalar_one_or_none()
-    if not game:
-        raise HTTPException(status_code=404, detail="Game not found")
-    return game
-
-@router.post("/", response_model=GameOut, status_code=201)
-async def create_game(payload: GameCreate, db: AsyncSession = Depends(get_db)):
-    # جلوگیری از تکرار slug
-    exists = await db.execute(select(Game).where(Game.slug == payload.slug))
-    if exists.scalar_one_or_none():
-        raise HTTPException(status_code=409, detail="Slug already exists")
-    game = Game(**payload.model_dump())
-    db.add(game)
-    await db.commit()
-    await db.refresh(game)
-    return game
-
-@router.put("/{game_id}", response_model=GameOut)
-async def update_game(game_id: int, payload: GameUpdate, db: AsyncSession = Depends(get_db)):
-    res = await db.execute(select(Game).where(Game.id == game_id))
-    game = res.scalar_one_or_none()
-    if not game:
-        raise HTTPException(status_code=404, detail="Game not found")
-    for k, v in payload.model_dump(exclude_unset=True).items():
-        setattr(game, k, v)
-    await db.commit()
-    await db.refresh(game)
-    return game
-
-@router.delete("/{game_id}", status_code=204)
-async def delete_game(game_id: int, db: AsyncSession = Depends(get_db)):
-    res = await db.execute(select(Game).where(Game.id == game_id))
-    game = res.scalar_one_or_none()
-    if not game:
-        raise HTTPException(status_code=404, detail="Game not found")
-    await db.delete(game)
-    await db.commit()
-    return
-
-@router.delete("/", status_code=204)
-async def delete_all_games(db: AsyncSession = Depends(get_db)):
-    await db.execute(delete(Game))
-    await db.commit()
-    return
-
-# استفاده از Thread به‌عنوان دمو (Thread برای پردازش موازی سبک)
-from threading import Thread
-def _scrape_thread(db_factory):
-    import anyio
-    async def _run():
-        async for db in db_factory():
-            await scrape_and_upsert(db)
-            break
-    anyio.run(_run)
-
-@router.post("/refresh", summary="Scrape & upsert from Epic Games (threaded)")
-async def refresh_games(background: bool = True, db: AsyncSession = Depends(get_db)):
-    """
-    اگر background=True باشد با Thread اجرا می‌شود.
-    """
-    if background:
-        t = Thread(target=_scrape_thread, args=(get_db,))
-        t.daemon = True
-        t.start()
-        return {"status": "started in background thread"}
-    else:
-        result = await scrape_and_upsert(db)
-        return {"status": "done", **result}
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete
+from datetime import datetime, timedelta, timezone
+from typing import List, Literal, Optional
+
+from app.utils.deps import get_db, get_read_db
+from app.models import Game, GamePriceSummary
+from app.schemas.game import GameCreate, GameUpdate, GameOut, GameExpandedOut, GameSearchOut
+from app.schemas.price_offer import PriceHistoryOut, PriceSummaryOut
+from app.services.game_queries import (
+    GameFilters, SortKey, SortOrder, expand_options, expand_query, game_view, keyset_page, next_cursor, search_games,
+)
+from app.services.bulk_import import NDJSON_REQUEST_BODY, bulk_import
+from app.services.jobs import job_manager
+from app.services.prices import BUCKETS, MAX_BUCKETS, price_history, summary_view
+
+router = APIRouter(prefix="/games", tags=["games"])
+
+@router.get("/", response_model=List[GameExpandedOut], response_model_exclude_unset=True)
+async def list_games(
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor from the previous page"),
+    sort: SortKey = Query("id"),
+    order: SortOrder = Query("asc"),
+    filters: GameFilters = Depends(),
+    expand: set[str] = Depends(expand_query),
+    offset: int = Query(0, ge=0, deprecated=True, description="Ignored when cursor is given; use cursor instead"),
+):
+    """
+    صفحه‌بندی keyset روی (sort, id): هزینهٔ صفحهٔ ۵۰۰ مثل صفحهٔ ۱ است.
+    اگر صفحهٔ بعدی وجود داشته باشد، cursor آن در هدر X-Next-Cursor می‌آید.
+    """
+    stmt = filters.apply(select(Game).options(*expand_options(expand)))
+    try:
+        stmt = keyset_page(stmt, sort, order, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if offset and not cursor:
+        stmt = stmt.offset(offset)
+    rows = (await db.execute(stmt)).scalars().all()
+    nxt = next_cursor(rows, sort, order, limit)
+    if nxt:
+        response.headers["X-Next-Cursor"] = nxt
+    return [game_view(g, expand) for g in rows[:limit]]
+
+# باید قبل از /{game_id} تعریف شود
+@router.get("/search", response_model=List[GameSearchOut])
+async def search(
+    q: str = Query(..., min_length=2, max_length=200),
+    db: AsyncSession = Depends(get_read_db),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=1000),
+    filters: GameFilters = Depends(),
+):
+    """جستجوی رتبه‌بندی‌شده در عنوان و توضیحات (full-text + trigram برای غلط تایپی)"""
+    res = await db.execute(search_games(q, filters, limit, offset))
+    return [
+        GameSearchOut(**GameOut.model_validate(game).model_dump(), rank=rank)
+        for game, rank in res.all()
+    ]
+
+@router.get("/{game_id}", response_model=GameExpandedOut, response_model_exclude_unset=True)
+async def get_game(game_id: int, db: AsyncSession = Depends(get_read_db), expand: set[str] = Depends(expand_query)):
+    res = await db.execute(select(Game).where(Game.id == game_id).options(*expand_options(expand)))
+    game = res.scalar_one_or_none()
+    if not game:
+        raise HTTPException(status_code=404, detail="Game not found")
+    return game_view(game, expand)
+
+@router.get("/{game_id}/price-history", response_model=PriceHistoryOut)
+async def get_price_history(
+    game_id: int,
+    bucket: Literal["day", "week"] = Query("day"),
+    start: Optional[datetime] = Query(None, description="Defaults to one year before `end`"),
+    end: Optional[datetime] = Query(None, description="Defaults to now"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """تاریخچهٔ قیمت، خلاصه‌شده در bucketهای روزانه/هفتگی (در خود دیتابیس)"""
+    if await db.get(Game, game_id) is None:
+        raise HTTPException(status_code=404, detail="Game not found")
+    end = end or datetime.now(timezone.utc)
+    start = start or end - timedelta(days=365)
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    if (end - start) / BUCKETS[bucket] > MAX_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"Range too large for {bucket} buckets (max {MAX_BUCKETS})")
+    points = await price_history(db, game_id, bucket, start, end)
+    return {"game_id": game_id, "bucket": bucket, "points": points}
+
+@router.get("/{game_id}/price-summary", response_model=PriceSummaryOut)
+async def get_price_summary(game_id: int, db: AsyncSession = Depends(get_read_db)):
+    """قیمت فعلی، کمترین قیمت و میانگین تخفیف از جدول تجمیعی game_price_summaries"""
+    summary = await db.get(GamePriceSummary, game_id)
+    if summary is None:
+        if await db.get(Game, game_id) is None:
+            raise HTTPException(status_code=404, detail="Game not found")
+        raise HTTPException(status_code=404, detail="No price data for this game")
+    return summary_view(summary)
+
+@router.post("/", response_model=GameOut, status_code=201)
+async def create_game(payload: GameCreate, db: AsyncSession = Depends(get_db)):
+    # جلوگیری از تکرار slug
+    exists = await db.execute(select(Game).where(Game.slug == payload.slug))
+    if exists.scalar_one_or_none():
+        raise HTTPException(status_code=409, detail="Slug already exists")
+    game = Game(**payload.model_dump())
+    db.add(game)
+    await db.commit()
+    await db.refresh(game)
+    return game
+
+@router.post("/bulk", summary="Bulk NDJSON import (COPY + merge)", openapi_extra=NDJSON_REQUEST_BODY)
+async def bulk_import_games(request: Request, db: AsyncSession = Depends(get_db)):
+    """
+    هر خط یک بازی: {"slug", "title", "description", "release_date", "publisher_id", "developer_id"}.
+    بر اساس slug ادغام می‌شود؛ ردیف‌های رد شده با شمارهٔ خط گزارش می‌شوند.
+    """
+    return await bulk_import(db, "games", request.stream())
+
+@router.put("/{game_id}", response_model=GameOut)
+async def update_game(game_id: int, payload: GameUpdate, db: AsyncSession = Depends(get_db)):
+    res = await db.execute(select(Game).where(Game.id == game_id))
+    game = res.scalar_one_or_none()
+    if not game:
+        raise HTTPException(status_code=404, detail="Game not found")
+    for k, v in payload.model_dump(exclude_unset=True).items():
+        setattr(game, k, v)
+    await db.commit()
+    await db.refresh(game)
+    return game
+
+@router.delete("/{game_id}", status_code=204)
+async def delete_game(game_id: int, db: AsyncSession = Depends(get_db)):
+    res = await db.execute(select(Game).where(Game.id == game_id))
+    game = res.scalar_one_or_none()
+    if not game:
+        raise HTTPException(status_code=404, detail="Game not found")
+    await db.delete(game)
+    await db.commit()
+    return
+
+@router.delete("/", status_code=204)
+async def delete_all_games(db: AsyncSession = Depends(get_db)):
+    await db.execute(delete(Game))
+    await db.commit()
+    return
+
+@router.post("/refresh", summary="Scrape & upsert from Epic Games")
+async def refresh_games(
+    background: bool = True,
+    all_pages: Optional[bool] = Query(None, description="Crawl every browse page (defaults to scraper.crawl_all_pages)"),
+):
+    """
+    اسکرپ به‌صورت job روی event loop خود برنامه اجرا می‌شود؛ اگر اسکرپی در
+    حال اجرا باشد همان job برگردانده می‌شود. با background=False منتظر پایانش می‌مانیم.
+    """
+    job, created = job_manager.start(all_pages=all_pages)
+    if background:
+        return {"status": "started" if created else "already running", "job_id": job.id}
+    await job_manager.wait(job)
+    if job.status != "succeeded":
+        raise HTTPException(status_code=500, detail=job.error or f"Scrape {job.status}")
+    return {"status": "done", "job_id": job.id, **job.result}
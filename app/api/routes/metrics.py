@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.services.metrics import CONTENT_TYPE, registry
+
+# خارج از /api و بدون cache؛ Prometheus مستقیم /metrics را می‌خواند
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse, summary="Prometheus metrics")
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
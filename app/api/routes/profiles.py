@@ -0,0 +1,43 @@
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import FileResponse, PlainTextResponse
+
+from app.services.profiling import list_profiles, profile_path, render_text, token_ok
+
+SORT_KEYS = ("cumulative", "tottime", "ncalls")
+
+
+def require_profile_token(
+    x_profile_token: Optional[str] = Header(None),
+    profile_token: Optional[str] = Query(None),
+) -> None:
+    # وقتی profiling خاموش است، این مسیرها هم وجود ندارند
+    if not token_ok(x_profile_token or profile_token):
+        raise HTTPException(status_code=404, detail="Not Found")
+
+
+router = APIRouter(prefix="/admin/profiles", tags=["Admin"], dependencies=[Depends(require_profile_token)])
+
+
+@router.get("")
+async def get_profiles():
+    """پروفایل‌های ذخیره‌شده، جدیدترین اول"""
+    return await asyncio.to_thread(list_profiles)
+
+
+@router.get("/{name}", summary="Download a profile (.prof for pstats/snakeviz) or view it as text")
+async def get_profile(
+    name: str,
+    format: str = Query("prof", pattern="^(prof|text)$"),
+    sort: str = Query("cumulative", description=f"Text view sort key: {', '.join(SORT_KEYS)}"),
+):
+    path = profile_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "text":
+        if sort not in SORT_KEYS:
+            raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(SORT_KEYS)}")
+        return PlainTextResponse(await asyncio.to_thread(render_text, path, sort))
+    return FileResponse(path, media_type="application/octet-stream", filename=path.name)
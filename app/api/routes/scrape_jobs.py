@@ -0,0 +1,48 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+from typing import Optional
+
+from app.services.jobs import job_manager
+from app.services.profiling import busy as profiling_busy
+
+router = APIRouter(prefix="/scrape", tags=["Scrape Jobs"])
+
+@router.post("/jobs", status_code=202)
+async def start_scrape_job(
+    request: Request,
+    all_pages: Optional[bool] = Query(None, description="Crawl every browse page (defaults to scraper.crawl_all_pages)"),
+    profile: bool = Query(False, description="Run the scrape under cProfile (needs the profiling admin token)"),
+):
+    if profile and not getattr(request.state, "profile_authorized", False):
+        raise HTTPException(status_code=403, detail="Profiling is disabled or the profile token is missing/invalid")
+    if profile and profiling_busy():
+        raise HTTPException(status_code=409, detail="Another profile is already running")
+    job, created = job_manager.start(all_pages=all_pages, profile=profile)
+    if not created and job.params != job_manager.params(all_pages):
+        # اسکرپ در حال اجرا کار دیگری می‌کند؛ پاسخِ آن جواب این درخواست نیست
+        raise HTTPException(status_code=409, detail={
+            "message": "A scrape with different parameters is already running",
+            "job_id": job.id, "params": job.params,
+        })
+    if profile and not job.profile:
+        raise HTTPException(status_code=409, detail={"message": "A scrape is already running without profiling", "job_id": job.id})
+    return {"coalesced": not created, **job.to_dict()}
+
+@router.get("/jobs")
+async def list_scrape_jobs():
+    return [job.to_dict() for job in job_manager.list()]
+
+@router.get("/jobs/{job_id}")
+async def get_scrape_job(job_id: str):
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Scrape job not found")
+    return job.to_dict()
+
+@router.delete("/jobs/{job_id}")
+async def cancel_scrape_job(job_id: str):
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Scrape job not found")
+    if not job_manager.cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Scrape job already {job.status}")
+    return {"detail": "Cancellation requested", "id": job_id}
@@ -1,15 +1,12 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
-from app.utils.deps import get_db
-from app.services.scraper import scrape_and_upsert, dns_debug
-
-router = APIRouter()
-
-@router.post("/scrape-test")
-async def scrape_test(db: AsyncSession = Depends(get_db)):
-    result = await scrape_and_upsert(db)
-    return result
-
-@router.get("/dns-check")
-async def dns_check():
-    return await dns_debug("store.epicgames.com")
+from fastapi import APIRouter, HTTPException
+from app.services.jobs import job_manager
+
+router = APIRouter()
+
+@router.post("/scrape-test")
+async def scrape_test():
+    job, _ = job_manager.start()
+    await job_manager.wait(job)
+    if job.status != "succeeded":
+        raise HTTPException(status_code=500, detail=job.error or f"Scrape {job.status}")
+    return job.result
@@ -1,46 +1,130 @@
-from __future__ import annotations
-import yaml
-from pydantic import BaseModel
-from pathlib import Path
-from typing import List, Optional
-
-
-class AppSettings(BaseModel):
-    name: str = "EpicGames API"
-    debug: bool = False
-
-
-class DBSettings(BaseModel):
-    url: str
-    echo: bool = False
-    pool_size: int = 10
-    max_overflow: int = 20
-
-
-class ScraperSettings(BaseModel):
-    base_url: str
-    browse_path: str
-    concurrency: int = 5
-    request_timeout: int = 20
-    delay_between_requests_ms: int = 300
-    user_agents: list[str] = []
-    smart_dns: Optional[List[str]] = None
-
-
-class Settings(BaseModel):
-    app: AppSettings
-    database: DBSettings
-    scraper: ScraperSettings
-
-
-# Fix for Pydantic v2
-Settings.model_rebuild()
-
-
-def load_settings(config_path: str | Path = "config.yaml") -> Settings:
-    with open(config_path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f)
-    return Settings(**data)
-
-
-settings = load_settings()
+from __future__ import annotations
+import yaml
+from pydantic import BaseModel
+from pathlib import Path
+from typing import List, Optional
+
+
+class AppSettings(BaseModel):
+    name: str = "EpicGames API"
+    debug: bool = False
+
+
+class DBSettings(BaseModel):
+    url: str
+    echo: bool = False
+    pool_size: int = 10
+    max_overflow: int = 20
+    # monthly price_offers partitions are created this far ahead
+    price_partition_months_ahead: int = 3
+    # read replicas for GET routes (round-robin); empty = everything on `url`
+    replica_urls: list[str] = []
+    # after a write, the client's reads stay on the primary this long (cookie; 0 disables)
+    read_your_writes_s: float = 5.0
+
+
+class ScraperSettings(BaseModel):
+    base_url: str
+    browse_path: str
+    concurrency: int = 5
+    request_timeout: int = 20
+    # shared httpx client (opened at app startup, reused by every scrape)
+    http2: bool = True
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 60.0
+    delay_between_requests_ms: int = 300
+    user_agents: list[str] = []
+    smart_dns: Optional[List[str]] = None
+    # "html" (browse + product pages) or "json_catalog" (batched catalog API)
+    source: str = "html"
+    catalog_url: Optional[str] = None
+    catalog_page_size: int = 40
+    catalog_params: dict[str, str] = {"locale": "en-US", "country": "US"}
+    # adaptive per-host token bucket (AIMD); rate_limit_rps defaults to 1000 / delay_between_requests_ms
+    rate_limit_rps: Optional[float] = None
+    rate_limit_min_rps: float = 0.2
+    rate_limit_max_rps: float = 20.0
+    rate_limit_burst: Optional[int] = None
+    rate_limit_increase: float = 0.5
+    rate_limit_decrease: float = 0.5
+    rate_limit_target_latency_ms: int = 3000
+    # crawl mode: walk every browse page through a bounded enrich/write pipeline
+    crawl_all_pages: bool = False
+    browse_page_size: int = 40
+    max_pages: int = 500
+    queue_size: int = 100
+    write_batch_size: int = 200
+    # rows per INSERT ... ON CONFLICT statement
+    upsert_batch_size: int = 500
+    # unchanged games only get last_scraped_at bumped once per this interval
+    touch_interval_hours: int = 24
+    # HTML parsing runs in this many worker processes (0 = thread executor)
+    parse_workers: int = 2
+    # status-aware retries: per-run budget = retry_budget_min + ratio * requests
+    retry_attempts: int = 3
+    retry_backoff_s: float = 1.0
+    retry_backoff_max_s: float = 30.0
+    retry_budget_ratio: float = 0.1
+    retry_budget_min: int = 10
+    # per-host circuit breaker over the last breaker_window requests
+    breaker_window: int = 50
+    breaker_min_requests: int = 20
+    breaker_error_rate: float = 0.5
+    breaker_cooldown_s: float = 30.0
+    # on-disk conditional-request cache (None disables it)
+    cache_dir: Optional[str] = ".cache/http"
+    cache_max_mb: int = 256
+
+
+class ResponseCacheSettings(BaseModel):
+    enabled: bool = True
+    # "memory" (per process) or "redis" (shared between workers; needs the redis package)
+    backend: str = "memory"
+    redis_url: Optional[str] = None
+    ttl_s: float = 300.0
+    max_entries: int = 2048
+    # larger (or streamed) responses are passed through uncached
+    max_body_kb: int = 512
+    # only GETs under these prefixes are cached
+    include_prefixes: list[str] = ["/api/"]
+    exclude_prefixes: list[str] = ["/api/scrape", "/api/test", "/api/export", "/api/admin"]
+
+
+class MetricsSettings(BaseModel):
+    # /metrics endpoint and the per-route latency middleware
+    enabled: bool = True
+    # histogram bucket upper bounds, in seconds
+    latency_buckets: list[float] = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+
+
+class ProfilingSettings(BaseModel):
+    # off by default; when off the middleware isn't installed at all
+    enabled: bool = False
+    # admin token, sent as the X-Profile-Token header or ?profile_token=; required when enabled
+    token: Optional[str] = None
+    directory: str = ".cache/profiles"
+    # only the newest `keep` profiles are kept on disk
+    keep: int = 50
+
+
+class Settings(BaseModel):
+    app: AppSettings
+    database: DBSettings
+    scraper: ScraperSettings
+    response_cache: ResponseCacheSettings = ResponseCacheSettings()
+    metrics: MetricsSettings = MetricsSettings()
+    profiling: ProfilingSettings = ProfilingSettings()
+
+
+# Fix for Pydantic v2
+Settings.model_rebuild()
+
+
+def load_settings(config_path: str | Path = "config.yaml") -> Settings:
+    with open(config_path, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f)
+    return Settings(**data)
+
+
+settings = load_settings()
@@ -1,4 +1,4 @@
-from sqlalchemy.orm import DeclarativeBase
-
-class Base(DeclarativeBase):
-    pass
+from sqlalchemy.orm import DeclarativeBase
+
+class Base(DeclarativeBase):
+    pass
@@ -0,0 +1,81 @@
+from __future__ import annotations
+from datetime import date, datetime, timezone
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.config import settings
+
+
+def _add_months(d: date, months: int) -> date:
+    y, m = divmod(d.month - 1 + months, 12)
+    return date(d.year + y, m + 1, 1)
+
+
+async def _create_partition(conn: AsyncConnection, lo: date, hi: date, has_default: bool) -> None:
+    """
+    Create the partition for [lo, hi). If the DEFAULT partition already holds
+    rows in that range (history inserted before the partition existed), a
+    plain CREATE ... PARTITION OF would be rejected, so the partition is
+    built standalone, the rows are moved out of DEFAULT into it and it is
+    attached afterwards, all under a savepoint.
+    """
+    # نام و بازه از تاریخ ساخته می‌شوند، نه از ورودی کاربر
+    name = f"price_offers_{lo:%Y_%m}"
+    bounds = f"FROM ('{lo.isoformat()}') TO ('{hi.isoformat()}')"
+    in_range = f"scraped_at >= '{lo.isoformat()}' AND scraped_at < '{hi.isoformat()}'"
+    if not has_default or not await conn.scalar(text(f"SELECT EXISTS (SELECT 1 FROM price_offers_default WHERE {in_range})")):
+        await conn.execute(text(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF price_offers FOR VALUES {bounds}"))
+        return
+    async with conn.begin_nested():
+        # تا پایان انتقال کسی در DEFAULT نمی‌نویسد؛ خواندن آزاد است
+        await conn.execute(text("LOCK TABLE price_offers_default IN EXCLUSIVE MODE"))
+        await conn.execute(text(f"CREATE TABLE {name} (LIKE price_offers INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+        await conn.execute(text(
+            f"WITH moved AS (DELETE FROM price_offers_default WHERE {in_range} RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ))
+        # ایندکس‌ها، کلید اصلی و FK جدول والد هنگام attach ساخته می‌شوند
+        await conn.execute(text(f"ALTER TABLE price_offers ATTACH PARTITION {name} FOR VALUES {bounds}"))
+
+
+async def ensure_price_partitions(
+    conn: AsyncConnection, months_ahead: int | None = None, since: date | None = None
+) -> None:
+    """
+    Create the monthly `price_offers` partitions from last month (or the
+    month of `since`, for imports of older history) up to `months_ahead`
+    months from now, plus a DEFAULT partition as a safety net. Rows that
+    landed in DEFAULT for a month that now gets its partition are moved
+    into it (see _create_partition).
+
+    Idempotent; runs at startup and before every scrape, so partitions always
+    exist before rows for that month arrive. Does nothing on other dialects
+    or when `price_offers` is a plain (legacy, unpartitioned) table.
+    """
+    if conn.dialect.name != "postgresql":
+        return
+    partitioned = await conn.scalar(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table pt "
+        "JOIN pg_class c ON c.oid = pt.partrelid "
+        "WHERE c.relname = 'price_offers' AND pg_table_is_visible(c.oid))"
+    ))
+    if not partitioned:
+        return
+    if months_ahead is None:
+        months_ahead = settings.database.price_partition_months_ahead
+    this_month = datetime.now(timezone.utc).date().replace(day=1)
+    first = _add_months(this_month, -1)
+    older = 0
+    if since is not None and since.replace(day=1) < first:
+        older = (first.year - since.year) * 12 + first.month - since.month
+    existing = set((await conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'price_offers'::regclass"
+    ))).scalars().all())
+    has_default = "price_offers_default" in existing
+    for i in range(-1 - older, months_ahead + 1):
+        lo, hi = _add_months(this_month, i), _add_months(this_month, i + 1)
+        if f"price_offers_{lo:%Y_%m}" not in existing:
+            await _create_partition(conn, lo, hi, has_default)
+    await conn.execute(text("CREATE TABLE IF NOT EXISTS price_offers_default PARTITION OF price_offers DEFAULT"))
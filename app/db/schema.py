@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.schema import CreateColumn
+
+import app.models  # noqa: F401  (همهٔ جدول‌ها روی Base.metadata ثبت شوند)
+from app.db.base import Base
+from app.db.partitions import ensure_price_partitions
+
+
+@compiles(CreateColumn, "sqlite")
+def _sqlite_column(element: CreateColumn, compiler, **kw) -> str:
+    column = element.element
+    # ستون tsvector محاسبه‌شده (جستجو) فقط در Postgres معنا دارد؛ در SQLite یک TEXT خالی
+    if isinstance(column.type, TSVECTOR):
+        return f"{compiler.preparer.format_column(column)} TEXT"
+    # BIGSERIAL درون کلید اصلی چندستونی (price_offers) در SQLite ممکن نیست؛ ستون ساده می‌ماند
+    if column.primary_key and column.autoincrement is True and len(column.table.primary_key.columns) > 1:
+        return f"{compiler.preparer.format_column(column)} INTEGER NOT NULL"
+    return compiler.visit_create_column(element, **kw)
+
+
+async def init_schema(conn: AsyncConnection) -> None:
+    """
+    Extensions, tables/indexes and the price_offers partitions. Idempotent;
+    run by app startup and the scraper benchmark on a fresh database.
+    Postgres-only DDL is skipped elsewhere, so SQLite files (tests, local
+    replica setups) can be initialized too; search and price history
+    need Postgres.
+    """
+    if conn.dialect.name == "postgresql":
+        # ایندکس trigram جستجو به pg_trgm نیاز دارد
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    await conn.run_sync(Base.metadata.create_all)
+    await ensure_price_partitions(conn)
@@ -1,22 +1,128 @@
-from __future__ import annotations
-
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from app.core.config import settings
-
-engine = create_async_engine(
-    settings.database.url,
-    echo=settings.database.echo,
-    pool_size=settings.database.pool_size,
-    max_overflow=settings.database.max_overflow,
-    future=True,
-)
-
-AsyncSessionLocal = async_sessionmaker(
-    bind=engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-)
-
-async def get_session() -> AsyncSession:
-    async with AsyncSessionLocal() as session:
-        yield session
+from __future__ import annotations
+import itertools, time
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+
+# کلاینتی که تازه نوشته، تا این زمان (epoch) از primary می‌خواند
+PIN_COOKIE = "db_primary_until"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def _make_engine(url: str) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        echo=settings.database.echo,
+        pool_size=settings.database.pool_size,
+        max_overflow=settings.database.max_overflow,
+        future=True,
+    )
+
+
+def _read_only_engine(url: str) -> AsyncEngine:
+    """
+    Engine whose transactions can't write: READ ONLY transactions on
+    Postgres (shares the pool of any engine for the same URL options);
+    on SQLite its own pool with `PRAGMA query_only` on every connection.
+    """
+    e = _make_engine(url)
+    if e.dialect.name == "postgresql":
+        return e.execution_options(postgresql_readonly=True)
+    if e.dialect.name == "sqlite":
+        @event.listens_for(e.sync_engine, "connect")
+        def _query_only(dbapi_connection, _record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA query_only = ON")
+            cursor.close()
+    return e
+
+
+def _sessionmaker(bind: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(bind=bind, class_=AsyncSession, expire_on_commit=False)
+
+
+engine = _make_engine(settings.database.url)
+
+AsyncSessionLocal = _sessionmaker(engine)
+
+# خواندن از primary (بدون replica، یا برای کلاینتِ pin‌شده) هم فقط‌خواندنی است
+primary_read_engine = engine.execution_options(postgresql_readonly=True) \
+    if engine.dialect.name == "postgresql" else _read_only_engine(settings.database.url)
+PrimaryReadSession = _sessionmaker(primary_read_engine)
+
+replica_engines = [_read_only_engine(url) for url in settings.database.replica_urls]
+_replica_sessions = itertools.cycle([_sessionmaker(e) for e in replica_engines])
+
+
+def read_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    """Next replica's sessionmaker (round-robin), or a read-only one on the primary when no replicas are configured."""
+    return next(_replica_sessions) if replica_engines else PrimaryReadSession
+
+
+def pinned_to_primary(conn: HTTPConnection) -> bool:
+    until = conn.cookies.get(PIN_COOKIE)
+    try:
+        return until is not None and float(until) > time.time()
+    except ValueError:
+        return False
+
+
+async def get_session() -> AsyncSession:
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+async def get_read_session(conn: HTTPConnection) -> AsyncSession:
+    """
+    Session for read-only routes: a replica, picked round-robin, unless the
+    client wrote within the last `read_your_writes_s` seconds (see
+    PrimaryPinMiddleware) — then the primary, so it sees its own writes
+    despite replication lag. Every transaction on it is read-only, so a
+    write from a GET route fails instead of silently going through.
+    """
+    factory = PrimaryReadSession if pinned_to_primary(conn) else read_sessionmaker()
+    async with factory() as session:
+        yield session
+
+
+def pooled_engines() -> list[tuple[str, AsyncEngine]]:
+    """(role, engine) for every engine with a pool of its own."""
+    engines = [("primary", engine)]
+    # روی Postgres موتور فقط‌خواندنی همان pool اصلی را به اشتراک می‌گذارد
+    if primary_read_engine.pool is not engine.pool:
+        engines.append(("primary_read", primary_read_engine))
+    engines += [("replica", e) for e in replica_engines]
+    return engines
+
+
+async def dispose_engines() -> None:
+    for _, e in pooled_engines():
+        await e.dispose()
+
+
+class PrimaryPinMiddleware:
+    """
+    After a successful write request, sets PIN_COOKIE so that client's reads
+    go to the primary for `read_your_writes_s` seconds. Installed only when
+    replicas are configured and the window is positive.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and 200 <= message["status"] < 400:
+                window = settings.database.read_your_writes_s
+                cookie = f"{PIN_COOKIE}={time.time() + window:.3f}; Max-Age={int(window) or 1}; Path=/; HttpOnly; SameSite=Lax"
+                message = {**message, "headers": [*message.get("headers", []), (b"set-cookie", cookie.encode("latin-1"))]}
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -1,28 +1,64 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from app.core.config import settings
-from app.api import api_router
-from app.db.session import engine
-from app.db.base import Base
-
-app = FastAPI(
-    title=settings.app.name,
-    debug=settings.app.debug,
-    version="1.0.0",
-    contact={"name": "API"},
-)
-
-# CORS آزاد برای Swagger UI
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"], allow_credentials=True,
-    allow_methods=["*"], allow_headers=["*"],
-)
-
-# ایجاد جداول در استارتاپ (برای سادگی؛ در عمل بهتر است Alembic)
-@app.on_event("startup")
-async def on_startup():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
-app.include_router(api_router, prefix="/api")
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from app.core.config import settings
+from app.api import api_router
+from app.api.routes import metrics
+from app.db.session import PrimaryPinMiddleware, dispose_engines, engine, pooled_engines
+from app.db.schema import init_schema
+from app.services.http_client import close_client, open_client
+from app.services.jobs import job_manager
+from app.services.metrics import MetricsMiddleware, register_pool
+from app.services.parse_pool import shutdown_parse_pool
+from app.services.profiling import ProfilingMiddleware
+from app.services.response_cache import ResponseCacheMiddleware
+
+app = FastAPI(
+    title=settings.app.name,
+    debug=settings.app.debug,
+    version="1.0.0",
+    contact={"name": "API"},
+)
+
+# cache پاسخ‌های GET؛ داخل CORS می‌ماند تا هدرهای CORS برای هر Origin جدا ساخته شوند
+app.add_middleware(ResponseCacheMiddleware)
+
+# با replica: کلاینتی که تازه نوشته، مدتی از primary می‌خواند
+if settings.database.replica_urls and settings.database.read_your_writes_s > 0:
+    app.add_middleware(PrimaryPinMiddleware)
+
+# CORS آزاد برای Swagger UI
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"], allow_credentials=True,
+    allow_methods=["*"], allow_headers=["*"],
+)
+
+# فقط وقتی روشن است نصب می‌شود؛ بیرون از cache تا درخواست profile‌شده واقعاً اجرا شود
+if settings.profiling.enabled:
+    app.add_middleware(ProfilingMiddleware)
+
+# بیرونی‌ترین لایه تا زمان cache و CORS هم در latency حساب شود
+if settings.metrics.enabled:
+    app.add_middleware(MetricsMiddleware)
+    # primary و هر replica جدا؛ برچسب host:port/database (بدون رمز عبور)
+    for role, e in pooled_engines():
+        port = f":{e.url.port}" if e.url.port else ""
+        register_pool(e.pool, role, f"{e.url.host or ''}{port}/{e.url.database or ''}")
+
+# ایجاد جداول در استارتاپ (برای سادگی؛ در عمل بهتر است Alembic)
+@app.on_event("startup")
+async def on_startup():
+    async with engine.begin() as conn:
+        await init_schema(conn)
+    await open_client()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await job_manager.shutdown()
+    await close_client()
+    shutdown_parse_pool()
+    await dispose_engines()
+
+app.include_router(api_router, prefix="/api")
+if settings.metrics.enabled:
+    app.include_router(metrics.router)
@@ -1,13 +1,14 @@
-from .publisher import Publisher
-from .developer import Developer
-from .genre import Genre
-from .platform import Platform
-from .game import Game
-from .price_offer import PriceOffer
-from .game_genre import GameGenre
-from .game_platform import GamePlatform
-
-__all__ = [
-    "Publisher", "Developer", "Genre", "Platform",
-    "Game", "PriceOffer", "GameGenre", "GamePlatform"
-]
+from .publisher import Publisher
+from .developer import Developer
+from .genre import Genre
+from .platform import Platform
+from .game import Game
+from .price_offer import PriceOffer
+from .game_price_summary import GamePriceSummary
+from .game_genre import GameGenre
+from .game_platform import GamePlatform
+
+__all__ = [
+    "Publisher", "Developer", "Genre", "Platform",
+    "Game", "PriceOffer", "GamePriceSummary", "GameGenre", "GamePlatform"
+]
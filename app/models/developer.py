@@ -1,12 +1,12 @@
-from sqlalchemy import String, Text
-from sqlalchemy.orm import Mapped, mapped_column, relationship
-from app.db.base import Base
-
-class Developer(Base):
-    __tablename__ = "developers"
-
-    id: Mapped[int] = mapped_column(primary_key=True)
-    name: Mapped[str] = mapped_column(String(255), unique=True, index=True)
-    website: Mapped[str | None] = mapped_column(Text(), nullable=True)
-
-    games: Mapped[list["Game"]] = relationship(back_populates="developer")
+from sqlalchemy import String, Text
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.db.base import Base
+
+class Developer(Base):
+    __tablename__ = "developers"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String(255), unique=True, index=True)
+    website: Mapped[str | None] = mapped_column(Text(), nullable=True)
+
+    games: Mapped[list["Game"]] = relationship(back_populates="developer")
@@ -1,23 +1,50 @@
-from datetime import date
-from sqlalchemy import String, Text, Date, ForeignKey
-from sqlalchemy.orm import Mapped, mapped_column, relationship
-from app.db.base import Base
-
-class Game(Base):
-    __tablename__ = "games"
-
-    id: Mapped[int] = mapped_column(primary_key=True)
-    slug: Mapped[str] = mapped_column(String(255), unique=True, index=True)
-    title: Mapped[str] = mapped_column(String(255), index=True)
-    description: Mapped[str | None] = mapped_column(Text(), nullable=True)
-    release_date: Mapped[date | None] = mapped_column(Date(), nullable=True)
-
-    publisher_id: Mapped[int | None] = mapped_column(ForeignKey("publishers.id", ondelete="SET NULL"))
-    developer_id: Mapped[int | None] = mapped_column(ForeignKey("developers.id", ondelete="SET NULL"))
-
-    publisher: Mapped["Publisher | None"] = relationship(back_populates="games")
-    developer: Mapped["Developer | None"] = relationship(back_populates="games")
-
-    price_offers: Mapped[list["PriceOffer"]] = relationship(back_populates="game", cascade="all, delete-orphan")
-    genres: Mapped[list["GameGenre"]] = relationship(back_populates="game", cascade="all, delete-orphan")
-    platforms: Mapped[list["GamePlatform"]] = relationship(back_populates="game", cascade="all, delete-orphan")
+from datetime import date, datetime
+from sqlalchemy import String, Text, Date, DateTime, ForeignKey, Index, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.db.base import Base
+
+class Game(Base):
+    __tablename__ = "games"
+    __table_args__ = (
+        # keyset pagination روی (کلید مرتب‌سازی, id) و فیلترها
+        Index("ix_games_title_id", "title", "id"),
+        Index("ix_games_release_date_id", "release_date", "id"),
+        Index("ix_games_publisher_id_id", "publisher_id", "id"),
+        Index("ix_games_developer_id_id", "developer_id", "id"),
+        # جستجو: full-text روی search_vector و trigram روی عنوان (اکستنشن pg_trgm)
+        Index("ix_games_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_games_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    slug: Mapped[str] = mapped_column(String(255), unique=True, index=True)
+    title: Mapped[str] = mapped_column(String(255), index=True)
+    description: Mapped[str | None] = mapped_column(Text(), nullable=True)
+    release_date: Mapped[date | None] = mapped_column(Date(), nullable=True)
+
+    publisher_id: Mapped[int | None] = mapped_column(ForeignKey("publishers.id", ondelete="SET NULL"))
+    developer_id: Mapped[int | None] = mapped_column(ForeignKey("developers.id", ondelete="SET NULL"))
+
+    # اثر انگشت محتوای اسکرپ‌شده؛ ردیف‌های بدون تغییر بازنویسی نمی‌شوند
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    last_scraped_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_changed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    # ستون محاسبه‌شده در خود Postgres؛ عنوان وزن A و توضیحات وزن B
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR(),
+        Computed(
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
+
+    publisher: Mapped["Publisher | None"] = relationship(back_populates="games")
+    developer: Mapped["Developer | None"] = relationship(back_populates="games")
+
+    price_offers: Mapped[list["PriceOffer"]] = relationship(back_populates="game", cascade="all, delete-orphan")
+    genres: Mapped[list["GameGenre"]] = relationship(back_populates="game", cascade="all, delete-orphan")
+    platforms: Mapped[list["GamePlatform"]] = relationship(back_populates="game", cascade="all, delete-orphan")
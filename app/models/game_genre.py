@@ -1,12 +1,14 @@
-from sqlalchemy import ForeignKey
-from sqlalchemy.orm import Mapped, mapped_column, relationship
-from app.db.base import Base
-
-class GameGenre(Base):
-    __tablename__ = "game_genres"
-
-    game_id: Mapped[int] = mapped_column(ForeignKey("games.id", ondelete="CASCADE"), primary_key=True)
-    genre_id: Mapped[int] = mapped_column(ForeignKey("genres.id", ondelete="CASCADE"), primary_key=True)
-
-    game: Mapped["Game"] = relationship(back_populates="genres")
-    genre: Mapped["Genre"] = relationship(back_populates="games")
+from sqlalchemy import ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.db.base import Base
+
+class GameGenre(Base):
+    __tablename__ = "game_genres"
+    # کلید اصلی (game_id, genre_id) است؛ فیلتر بر اساس genre به ترتیب برعکس نیاز دارد
+    __table_args__ = (Index("ix_game_genres_genre_id_game_id", "genre_id", "game_id"),)
+
+    game_id: Mapped[int] = mapped_column(ForeignKey("games.id", ondelete="CASCADE"), primary_key=True)
+    genre_id: Mapped[int] = mapped_column(ForeignKey("genres.id", ondelete="CASCADE"), primary_key=True)
+
+    game: Mapped["Game"] = relationship(back_populates="genres")
+    genre: Mapped["Genre"] = relationship(back_populates="games")
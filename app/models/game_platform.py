@@ -1,12 +1,14 @@
-from sqlalchemy import ForeignKey
-from sqlalchemy.orm import Mapped, mapped_column, relationship
-from app.db.base import Base
-
-class GamePlatform(Base):
-    __tablename__ = "game_platforms"
-
-    game_id: Mapped[int] = mapped_column(ForeignKey("games.id", ondelete="CASCADE"), primary_key=True)
-    platform_id: Mapped[int] = mapped_column(ForeignKey("platforms.id", ondelete="CASCADE"), primary_key=True)
-
-    game: Mapped["Game"] = relationship(back_populates="platforms")
-    platform: Mapped["Platform"] = relationship(back_populates="games")
+from sqlalchemy import ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.db.base import Base
+
+class GamePlatform(Base):
+    __tablename__ = "game_platforms"
+    # کلید اصلی (game_id, platform_id) است؛ فیلتر بر اساس platform به ترتیب برعکس نیاز دارد
+    __table_args__ = (Index("ix_game_platforms_platform_id_game_id", "platform_id", "game_id"),)
+
+    game_id: Mapped[int] = mapped_column(ForeignKey("games.id", ondelete="CASCADE"), primary_key=True)
+    platform_id: Mapped[int] = mapped_column(ForeignKey("platforms.id", ondelete="CASCADE"), primary_key=True)
+
+    game: Mapped["Game"] = relationship(back_populates="platforms")
+    platform: Mapped["Platform"] = relationship(back_populates="games")
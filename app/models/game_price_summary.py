@@ -0,0 +1,32 @@
+from datetime import datetime
+from sqlalchemy import Integer, Float, String, ForeignKey, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+class GamePriceSummary(Base):
+    """
+    Per-game aggregate over price_offers, rebuilt for a game whenever a new
+    price row is recorded for it (app/services/prices.py).
+    """
+    __tablename__ = "game_price_summaries"
+
+    game_id: Mapped[int] = mapped_column(ForeignKey("games.id", ondelete="CASCADE"), primary_key=True)
+    currency: Mapped[str] = mapped_column(String(8), default="USD")
+
+    # قیمت فعلی = آخرین ردیف تاریخچه
+    current_price_cents: Mapped[int | None] = mapped_column(Integer())
+    original_price_cents: Mapped[int | None] = mapped_column(Integer())
+    offer_starts_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    offer_ends_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    lowest_price_cents: Mapped[int | None] = mapped_column(Integer())
+    lowest_price_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    # میانگین وزنی تخفیف: فقط بازه‌های بسته اینجا هستند؛ بازهٔ باز (قیمت فعلی) موقع خواندن اضافه می‌شود
+    closed_discount_seconds: Mapped[float] = mapped_column(Float(), default=0.0)
+    closed_seconds: Mapped[float] = mapped_column(Float(), default=0.0)
+
+    changes: Mapped[int] = mapped_column(Integer(), default=0)
+    first_seen_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_changed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    refreshed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -1,11 +1,11 @@
-from sqlalchemy import String
-from sqlalchemy.orm import Mapped, mapped_column, relationship
-from app.db.base import Base
-
-class Genre(Base):
-    __tablename__ = "genres"
-
-    id: Mapped[int] = mapped_column(primary_key=True)
-    name: Mapped[str] = mapped_column(String(128), unique=True, index=True)
-
-    games: Mapped[list["GameGenre"]] = relationship(back_populates="genre", cascade="all, delete")
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.db.base import Base
+
+class Genre(Base):
+    __tablename__ = "genres"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String(128), unique=True, index=True)
+
+    games: Mapped[list["GameGenre"]] = relationship(back_populates="genre", cascade="all, delete")
@@ -1,11 +1,11 @@
-from sqlalchemy import String
-from sqlalchemy.orm import Mapped, mapped_column, relationship
-from app.db.base import Base
-
-class Platform(Base):
-    __tablename__ = "platforms"
-
-    id: Mapped[int] = mapped_column(primary_key=True)
-    name: Mapped[str] = mapped_column(String(128), unique=True, index=True)
-
-    games: Mapped[list["GamePlatform"]] = relationship(back_populates="platform", cascade="all, delete")
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.db.base import Base
+
+class Platform(Base):
+    __tablename__ = "platforms"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String(128), unique=True, index=True)
+
+    games: Mapped[list["GamePlatform"]] = relationship(back_populates="platform", cascade="all, delete")
@@ -1,20 +1,31 @@
-from datetime import datetime   
-from sqlalchemy import Integer, String, ForeignKey, DateTime
-from sqlalchemy.orm import Mapped, mapped_column, relationship
-from app.db.base import Base
-
-class PriceOffer(Base):
-    __tablename__ = "price_offers"
-
-    id: Mapped[int] = mapped_column(primary_key=True)
-    game_id: Mapped[int] = mapped_column(ForeignKey("games.id", ondelete="CASCADE"))
-    original_price_cents: Mapped[int | None] = mapped_column(Integer())
-    discounted_price_cents: Mapped[int | None] = mapped_column(Integer())
-    currency: Mapped[str] = mapped_column(String(8), default="USD")
-
-    # ✅ درست‌شده
-    starts_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
-    ends_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
-    scraped_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
-
-    game: Mapped["Game"] = relationship(back_populates="price_offers")
+from datetime import datetime   
+from sqlalchemy import BigInteger, Integer, String, ForeignKey, DateTime, Index, func
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.db.base import Base
+
+class PriceOffer(Base):
+    """
+    Price history: one row per *change* of a game's price or offer window,
+    range-partitioned by month on `scraped_at` (see app/db/partitions.py).
+    """
+    __tablename__ = "price_offers"
+    __table_args__ = (
+        Index("ix_price_offers_game_scraped", "game_id", "scraped_at"),
+        # ردیف‌ها به ترتیب زمان درج می‌شوند، پس BRIN روی scraped_at کوچک و کافی است
+        Index("ix_price_offers_scraped_at_brin", "scraped_at", postgresql_using="brin"),
+        {"postgresql_partition_by": "RANGE (scraped_at)"},
+    )
+
+    # کلید پارتیشن باید جزو کلید اصلی باشد
+    id: Mapped[int] = mapped_column(BigInteger(), primary_key=True, autoincrement=True)
+    scraped_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True, server_default=func.now())
+    game_id: Mapped[int] = mapped_column(ForeignKey("games.id", ondelete="CASCADE"))
+    original_price_cents: Mapped[int | None] = mapped_column(Integer())
+    discounted_price_cents: Mapped[int | None] = mapped_column(Integer())
+    currency: Mapped[str] = mapped_column(String(8), default="USD")
+
+    # ✅ درست‌شده
+    starts_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    ends_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    game: Mapped["Game"] = relationship(back_populates="price_offers")
@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+
+
+class GameLinksIn(BaseModel):
+    game_id: int
+    ids: list[int]
+
+
+class GameLinksOut(BaseModel):
+    game_id: int
+    ids: list[int]
+    added: int
+    removed: int
+
+
+class GameLinksBatchOut(BaseModel):
+    games: int
+    added: int
+    removed: int
@@ -1,26 +1,62 @@
-from datetime import date
-from pydantic import BaseModel
-
-
-class PriceOfferBase(BaseModel):
-    price: float
-    start_date: date
-    end_date: date | None = None
-
-
-class PriceOfferCreate(PriceOfferBase):
-    game_id: int
-
-
-class PriceOfferUpdate(BaseModel):
-    price: float | None = None
-    start_date: date | None = None
-    end_date: date | None = None
-
-
-class PriceOfferOut(PriceOfferBase):
-    id: int
-    game_id: int
-
-    class Config:
-        from_attributes = True
+from datetime import datetime
+from pydantic import BaseModel
+
+
+class PriceOfferBase(BaseModel):
+    original_price_cents: int | None = None
+    discounted_price_cents: int | None = None
+    currency: str = "USD"
+    starts_at: datetime | None = None
+    ends_at: datetime | None = None
+
+
+class PriceOfferCreate(PriceOfferBase):
+    game_id: int
+
+
+class PriceOfferUpdate(BaseModel):
+    original_price_cents: int | None = None
+    discounted_price_cents: int | None = None
+    currency: str | None = None
+    starts_at: datetime | None = None
+    ends_at: datetime | None = None
+
+
+class PriceOfferOut(PriceOfferBase):
+    id: int
+    game_id: int
+    scraped_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class PricePoint(BaseModel):
+    bucket: datetime
+    currency: str
+    original_price_cents: int | None = None
+    min_price_cents: int | None = None
+    max_price_cents: int | None = None
+    close_price_cents: int | None = None
+
+
+class PriceHistoryOut(BaseModel):
+    game_id: int
+    bucket: str
+    points: list[PricePoint]
+
+
+class PriceSummaryOut(BaseModel):
+    game_id: int
+    currency: str
+    current_price_cents: int | None = None
+    original_price_cents: int | None = None
+    current_discount_pct: float
+    offer_starts_at: datetime | None = None
+    offer_ends_at: datetime | None = None
+    lowest_price_cents: int | None = None
+    lowest_price_at: datetime | None = None
+    avg_discount_pct: float
+    changes: int
+    first_seen_at: datetime | None = None
+    last_changed_at: datetime | None = None
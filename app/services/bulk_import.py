@@ -0,0 +1,271 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from typing import AsyncIterator
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, create_model
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.partitions import ensure_price_partitions
+from app.services.prices import refresh_price_summaries
+
+# ردیف‌های معتبر در دسته‌های این‌چنینی با COPY به جدول staging می‌روند
+COPY_BATCH = 10_000
+# حداکثر جزئیات rejectها در پاسخ (شمارش کل همیشه دقیق است)
+MAX_REPORTED_REJECTS = 1000
+
+
+async def ndjson_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, bytes]]:
+    """Split a streamed body into (1-based line number, line), skipping blank lines."""
+    buf = b""
+    lineno = 0
+    async for chunk in chunks:
+        buf += chunk
+        *lines, buf = buf.split(b"\n")
+        for line in lines:
+            lineno += 1
+            if line.strip():
+                yield lineno, line
+    if buf.strip():
+        yield lineno + 1, buf
+
+
+class _Row(BaseModel):
+    # خروجی /export را هم می‌پذیرد (ستون‌های اضافه مثل id نادیده گرفته می‌شوند)
+    model_config = ConfigDict(extra="ignore")
+
+
+class GameRow(_Row):
+    slug: str = Field(min_length=1, max_length=255)
+    title: str = Field(min_length=1)
+    description: str | None = None
+    release_date: date | None = None
+    publisher_id: int | None = None
+    developer_id: int | None = None
+
+
+class PriceOfferRow(_Row):
+    game_id: int
+    original_price_cents: int | None = None
+    discounted_price_cents: int | None = None
+    currency: str = Field("USD", max_length=8)
+    starts_at: datetime | None = None
+    ends_at: datetime | None = None
+    scraped_at: datetime | None = None
+
+
+class BulkLoader(ABC):
+    """
+    NDJSON -> COPY into a temp staging table -> set-based merge.
+
+    Every row is validated on the way in; rows that fail validation, or the
+    `rejects` checks run in SQL against the staging table (unknown foreign
+    keys, duplicates), are reported by line number and left out of the
+    merge. Everything runs in one transaction on the request's session.
+    """
+
+    staging: str
+    row_model: type[BaseModel]
+    # (نام ستون, نوع Postgres) به ترتیب ستون‌های COPY؛ ستون line جدا اضافه می‌شود
+    columns: list[tuple[str, str]]
+    # (دلیل, ادامهٔ `DELETE FROM <staging> s ...`) برای ردیف‌هایی که نباید merge شوند
+    rejects: list[tuple[str, str]] = []
+
+    def record(self, row: BaseModel) -> tuple:
+        return tuple(getattr(row, name) for name, _ in self.columns)
+
+    async def before_merge(self, session: AsyncSession) -> None:
+        pass
+
+    @abstractmethod
+    async def merge(self, session: AsyncSession) -> dict:
+        """Merge the staging table into the target; return created/updated counts."""
+
+    async def after_merge(self, session: AsyncSession) -> None:
+        pass
+
+    async def load(self, session: AsyncSession, chunks: AsyncIterator[bytes]) -> dict:
+        conn = await session.connection()
+        cols = ", ".join(f"{name} {type_}" for name, type_ in self.columns)
+        await conn.execute(text(f"CREATE TEMP TABLE {self.staging} (line INT NOT NULL, {cols}) ON COMMIT DROP"))
+        # COPY مستقیم روی اتصال asyncpg، داخل همان تراکنش
+        driver = (await conn.get_raw_connection()).driver_connection
+        copy_columns = ["line", *(name for name, _ in self.columns)]
+
+        received, staged, rejected = 0, 0, 0
+        reported: list[dict] = []
+
+        def reject(line: int, reason: str) -> None:
+            nonlocal rejected
+            rejected += 1
+            if len(reported) < MAX_REPORTED_REJECTS:
+                reported.append({"line": line, "error": reason})
+
+        batch: list[tuple] = []
+        async for lineno, raw in ndjson_lines(chunks):
+            received += 1
+            try:
+                row = self.row_model.model_validate_json(raw)
+            except ValidationError as e:
+                err = e.errors()[0]
+                reject(lineno, f'{".".join(map(str, err["loc"])) or "row"}: {err["msg"]}')
+                continue
+            batch.append((lineno, *self.record(row)))
+            if len(batch) >= COPY_BATCH:
+                await driver.copy_records_to_table(self.staging, records=batch, columns=copy_columns)
+                staged += len(batch)
+                batch = []
+        if batch:
+            await driver.copy_records_to_table(self.staging, records=batch, columns=copy_columns)
+            staged += len(batch)
+
+        await conn.execute(text(f"ANALYZE {self.staging}"))
+        for reason, clause in self.rejects:
+            res = await conn.execute(text(f"DELETE FROM {self.staging} s {clause} RETURNING s.line"))
+            for (line,) in sorted(res.all()):
+                reject(line, reason)
+
+        await self.before_merge(session)
+        counts = await self.merge(session)
+        await self.after_merge(session)
+        await session.commit()
+
+        merged = staged - (rejected - (received - staged))
+        created, updated = counts.get("created", 0), counts.get("updated", 0)
+        reported.sort(key=lambda r: r["line"])
+        return {
+            "received": received,
+            "created": created,
+            "updated": updated,
+            "unchanged": merged - created - updated,
+            "rejected": rejected,
+            "rejects": reported,
+        }
+
+
+class GameLoader(BulkLoader):
+    staging = "bulk_games"
+    row_model = GameRow
+    columns = [
+        ("slug", "TEXT"), ("title", "TEXT"), ("description", "TEXT"), ("release_date", "DATE"),
+        ("publisher_id", "INT"), ("developer_id", "INT"),
+    ]
+    rejects = [
+        ("duplicate slug (a later line wins)",
+         "USING (SELECT slug, max(line) AS last FROM bulk_games GROUP BY slug HAVING count(*) > 1) d "
+         "WHERE s.slug = d.slug AND s.line < d.last"),
+        ("unknown publisher_id",
+         "WHERE s.publisher_id IS NOT NULL AND NOT EXISTS (SELECT 1 FROM publishers p WHERE p.id = s.publisher_id)"),
+        ("unknown developer_id",
+         "WHERE s.developer_id IS NOT NULL AND NOT EXISTS (SELECT 1 FROM developers d WHERE d.id = s.developer_id)"),
+    ]
+
+    async def merge(self, session: AsyncSession) -> dict:
+        # ردیف بدون تغییر بازنویسی نمی‌شود (بدون dead tuple)
+        res = await session.execute(text("""
+            WITH merged AS (
+                INSERT INTO games AS g (slug, title, description, release_date, publisher_id, developer_id, last_changed_at)
+                SELECT slug, left(title, 255), description, release_date, publisher_id, developer_id, now()
+                FROM bulk_games
+                ON CONFLICT (slug) DO UPDATE SET
+                    title = EXCLUDED.title,
+                    description = EXCLUDED.description,
+                    release_date = EXCLUDED.release_date,
+                    publisher_id = EXCLUDED.publisher_id,
+                    developer_id = EXCLUDED.developer_id,
+                    last_changed_at = EXCLUDED.last_changed_at,
+                    -- hash اسکرپر دیگر با ردیف جور نیست؛ اسکرپ بعدی آن را تغییرکرده می‌بیند
+                    content_hash = NULL
+                WHERE (g.title, g.description, g.release_date, g.publisher_id, g.developer_id)
+                    IS DISTINCT FROM
+                    (EXCLUDED.title, EXCLUDED.description, EXCLUDED.release_date, EXCLUDED.publisher_id, EXCLUDED.developer_id)
+                RETURNING (xmax = 0) AS inserted
+            )
+            SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted) FROM merged
+        """))
+        created, updated = res.one()
+        return {"created": created, "updated": updated}
+
+
+class PriceOfferLoader(BulkLoader):
+    staging = "bulk_price_offers"
+    row_model = PriceOfferRow
+    columns = [
+        ("game_id", "INT"), ("original_price_cents", "INT"), ("discounted_price_cents", "INT"),
+        ("currency", "TEXT"), ("starts_at", "TIMESTAMPTZ"), ("ends_at", "TIMESTAMPTZ"), ("scraped_at", "TIMESTAMPTZ"),
+    ]
+    rejects = [
+        ("unknown game_id", "WHERE NOT EXISTS (SELECT 1 FROM games g WHERE g.id = s.game_id)"),
+    ]
+
+    async def before_merge(self, session: AsyncSession) -> None:
+        # تاریخچهٔ قدیمی باید در پارتیشن ماه خودش بنشیند، نه در DEFAULT
+        since = await session.scalar(text("SELECT min(scraped_at) FROM bulk_price_offers"))
+        await ensure_price_partitions(await session.connection(), since=since.date() if since else None)
+
+    async def merge(self, session: AsyncSession) -> dict:
+        # ردیف‌های تاریخچه append می‌شوند؛ همان ردیف (بازی، زمان، قیمت) دوباره درج نمی‌شود
+        res = await session.execute(text("""
+            INSERT INTO price_offers (game_id, original_price_cents, discounted_price_cents, currency, starts_at, ends_at, scraped_at)
+            SELECT DISTINCT s.game_id, s.original_price_cents, s.discounted_price_cents, s.currency,
+                   s.starts_at, s.ends_at, COALESCE(s.scraped_at, now())
+            FROM bulk_price_offers s
+            WHERE NOT EXISTS (
+                SELECT 1 FROM price_offers p
+                WHERE p.game_id = s.game_id AND p.scraped_at = COALESCE(s.scraped_at, now())
+                  AND (p.original_price_cents, p.discounted_price_cents, p.currency, p.starts_at, p.ends_at)
+                      IS NOT DISTINCT FROM
+                      (s.original_price_cents, s.discounted_price_cents, s.currency, s.starts_at, s.ends_at)
+            )
+        """))
+        return {"created": res.rowcount}
+
+    async def after_merge(self, session: AsyncSession) -> None:
+        ids = (await session.execute(text("SELECT DISTINCT game_id FROM bulk_price_offers"))).scalars().all()
+        await refresh_price_summaries(session, list(ids))
+
+
+class LinkLoader(BulkLoader):
+    """game_genres / game_platforms: {"game_id": .., "<dim>_id": ..} per line."""
+
+    def __init__(self, table: str, dim_column: str, dim_table: str) -> None:
+        self.table = table
+        self.dim_column = dim_column
+        self.staging = f"bulk_{table}"
+        self.row_model = create_model(f"{table}_row", __base__=_Row, game_id=(int, ...), **{dim_column: (int, ...)})
+        self.columns = [("game_id", "INT"), (dim_column, "INT")]
+        self.rejects = [
+            ("unknown game_id", "WHERE NOT EXISTS (SELECT 1 FROM games g WHERE g.id = s.game_id)"),
+            (f"unknown {dim_column}", f"WHERE NOT EXISTS (SELECT 1 FROM {dim_table} d WHERE d.id = s.{dim_column})"),
+        ]
+
+    async def merge(self, session: AsyncSession) -> dict:
+        res = await session.execute(text(
+            f"INSERT INTO {self.table} (game_id, {self.dim_column}) "
+            f"SELECT DISTINCT game_id, {self.dim_column} FROM {self.staging} "
+            f"ON CONFLICT DO NOTHING"
+        ))
+        return {"created": res.rowcount}
+
+
+LOADERS = {
+    "games": GameLoader,
+    "price_offers": PriceOfferLoader,
+    "game_genres": lambda: LinkLoader("game_genres", "genre_id", "genres"),
+    "game_platforms": lambda: LinkLoader("game_platforms", "platform_id", "platforms"),
+}
+
+
+async def bulk_import(session: AsyncSession, kind: str, chunks: AsyncIterator[bytes]) -> dict:
+    """Load an NDJSON stream of `kind` rows (see LOADERS) and return the import report."""
+    return await LOADERS[kind]().load(session, chunks)
+
+
+# مستندات OpenAPI برای بدنهٔ NDJSON (بدنه به‌صورت stream خوانده می‌شود، نه با مدل pydantic)
+NDJSON_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/x-ndjson": {"schema": {"type": "string", "description": "One JSON object per line"}}},
+    }
+}
@@ -0,0 +1,121 @@
+from __future__ import annotations
+from typing import Iterable
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Developer, GameGenre, GamePlatform, Genre, Platform, Publisher
+
+# فیلد آیتم اسکرپ‌شده -> جدول بُعد
+DIMENSIONS = {
+    "publisher": Publisher,
+    "developer": Developer,
+    "genres": Genre,
+    "platforms": Platform,
+}
+
+# جدول واسط M2M و ستون بُعد در آن
+LINKS = {
+    "genres": (GameGenre, GameGenre.genre_id),
+    "platforms": (GamePlatform, GamePlatform.platform_id),
+}
+
+
+def _clean(name, model) -> str | None:
+    if not isinstance(name, str):
+        return None
+    name = name.strip()
+    return name[:model.name.type.length] or None
+
+
+def item_names(item: dict, field: str) -> list[str]:
+    """Cleaned, de-duplicated dimension names an item carries for `field`."""
+    model = DIMENSIONS[field]
+    value = item.get(field)
+    values = value if isinstance(value, (list, tuple)) else [value]
+    return sorted({n for v in values if (n := _clean(v, model))})
+
+
+class DimensionCache:
+    """
+    name -> id maps for publishers, developers, genres and platforms.
+
+    `load` reads each table once per scrape run; after that a batch only
+    touches the database for names it has never seen: one bulk INSERT ...
+    ON CONFLICT DO NOTHING plus one SELECT for their ids, per table.
+    """
+
+    def __init__(self) -> None:
+        self._ids: dict[type, dict[str, int]] = {model: {} for model in DIMENSIONS.values()}
+
+    async def load(self, session: AsyncSession) -> "DimensionCache":
+        for model, ids in self._ids.items():
+            ids.update({name: id_ for id_, name in (await session.execute(select(model.id, model.name))).all()})
+        return self
+
+    def id_of(self, field: str, name: str | None) -> int | None:
+        return self._ids[DIMENSIONS[field]].get(name) if name else None
+
+    def ids_of(self, field: str, names: Iterable[str]) -> set[int]:
+        ids = self._ids[DIMENSIONS[field]]
+        return {ids[n] for n in names if n in ids}
+
+    async def resolve(self, session: AsyncSession, items: Iterable[dict]) -> None:
+        """Make sure every dimension name in `items` has an id in the cache."""
+        items = list(items)
+        for field, model in DIMENSIONS.items():
+            ids = self._ids[model]
+            missing = {n for it in items for n in item_names(it, field) if n not in ids}
+            if not missing:
+                continue
+            missing = sorted(missing)
+            await session.execute(
+                pg_insert(model)
+                .values([{"name": n} for n in missing])
+                .on_conflict_do_nothing(index_elements=[model.name])
+            )
+            # شامل نام‌هایی که هم‌زمان (مثلاً از CRUD) اضافه شده‌اند
+            found = await session.execute(select(model.id, model.name).where(model.name.in_(missing)))
+            ids.update({name: id_ for id_, name in found.all()})
+
+
+async def sync_links(session: AsyncSession, field: str, links: dict[int, set[int]]) -> tuple[int, int]:
+    """
+    Make the M2M rows for `field` ("genres" or "platforms") match `links`
+    (game_id -> dimension ids) for exactly those games, as one statement
+    pair: a DELETE of the stale pairs and an INSERT ... ON CONFLICT DO
+    NOTHING of the missing ones. The desired pairs travel as two int arrays,
+    so the statement size doesn't grow with the batch. Returns
+    (added, removed).
+    """
+    if not links:
+        return 0, 0
+    model, dim_col = LINKS[field]
+    table, col = model.__tablename__, dim_col.key
+    pairs = [(game_id, dim_id) for game_id, dim_ids in links.items() for dim_id in sorted(dim_ids)]
+    params = {
+        "games": list(links),
+        "g": [g for g, _ in pairs],
+        "d": [d for _, d in pairs],
+    }
+    desired = "unnest(CAST(:g AS int[]), CAST(:d AS int[])) AS p(game_id, dim_id)"
+    removed = await session.execute(text(
+        f"DELETE FROM {table} l WHERE l.game_id = ANY(:games) AND NOT EXISTS "
+        f"(SELECT 1 FROM {desired} WHERE p.game_id = l.game_id AND p.dim_id = l.{col})"
+    ), params)
+    added = await session.execute(text(
+        f"INSERT INTO {table} (game_id, {col}) SELECT DISTINCT p.game_id, p.dim_id FROM {desired} "
+        f"ON CONFLICT DO NOTHING"
+    ), {"g": params["g"], "d": params["d"]}) if pairs else None
+    return (added.rowcount if added is not None else 0), removed.rowcount
+
+
+async def unknown_ids(session: AsyncSession, field: str, ids: Iterable[int]) -> list[int]:
+    """Ids among `ids` with no row in the dimension table behind `field`."""
+    ids = set(ids)
+    if not ids:
+        return []
+    model = DIMENSIONS[field]
+    found = set((await session.execute(select(model.id).where(model.id.in_(ids)))).scalars().all())
+    return sorted(ids - found)
@@ -0,0 +1,98 @@
+from __future__ import annotations
+import asyncio, random, time
+import httpx
+
+from app.core.config import settings
+from app.services.http_cache import HttpCache
+from app.services.metrics import record_response, scraper_stage_seconds
+from app.services.rate_limit import parse_retry_after, rate_limiter
+from app.services.resilience import (
+    RETRYABLE_STATUSES, CircuitOpenError, RetryableFetchError, TerminalFetchError,
+    backoff_delay, breakers, current_budget,
+)
+
+HEADERS_UA = settings.scraper.user_agents or [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118 Safari/537.36"
+]
+
+def _ua() -> dict[str, str]:
+    return {"User-Agent": random.choice(HEADERS_UA)}
+
+_http_cache: HttpCache | None = None
+
+def get_http_cache() -> HttpCache | None:
+    global _http_cache
+    if _http_cache is None and settings.scraper.cache_dir:
+        _http_cache = HttpCache(settings.scraper.cache_dir, settings.scraper.cache_max_mb * 1024 * 1024)
+    return _http_cache
+
+async def fetch_once(client: httpx.AsyncClient, url: str) -> str:
+    """
+    One request, classified: RetryableFetchError for statuses in
+    RETRYABLE_STATUSES, transport errors and an open breaker;
+    TerminalFetchError for every other error status.
+    """
+    breaker = breakers.for_url(url)
+    if not breaker.allow():
+        raise CircuitOpenError(url, None, "circuit open", retry_after=breaker.remaining())
+
+    cache = get_http_cache()
+    cached = await asyncio.to_thread(cache.get, url) if cache else None
+
+    headers = _ua()
+    if cached:
+        headers.update(cached.validators())
+
+    budget = current_budget.get()
+    if budget is not None:
+        budget.record_request()
+    limiter = rate_limiter.for_url(url)
+    await limiter.acquire()
+    started = time.monotonic()
+    try:
+        resp = await client.get(url, headers=headers, timeout=settings.scraper.request_timeout)
+    except httpx.TransportError as e:
+        limiter.observe(None, time.monotonic() - started)
+        scraper_stage_seconds.observe(time.monotonic() - started, "fetch")
+        record_response(url, None)
+        breaker.record(False)
+        raise RetryableFetchError(url, None, type(e).__name__) from e
+    retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+    limiter.observe(resp.status_code, time.monotonic() - started, retry_after)
+    scraper_stage_seconds.observe(time.monotonic() - started, "fetch")
+    record_response(url, resp.status_code, len(resp.content))
+
+    status = resp.status_code
+    # 4xx نهایی یعنی میزبان سالم است و فقط این URL مشکل دارد
+    breaker.record(status not in RETRYABLE_STATUSES and status < 500)
+    if status == 304 and cached:
+        return cached.text
+    if status in RETRYABLE_STATUSES:
+        raise RetryableFetchError(url, status, retry_after=retry_after)
+    if status >= 400:
+        raise TerminalFetchError(url, status)
+    if cache:
+        await asyncio.to_thread(cache.put, url, resp)
+    return resp.text
+
+async def fetch(client: httpx.AsyncClient, url: str, retries: int | None = None) -> str:
+    """
+    fetch_once with inline backoff retries (default `retry_attempts - 1`),
+    each drawn from the run's retry budget. Pipeline workers pass
+    `retries=0` and defer failures instead of sleeping in their slot.
+    """
+    if retries is None:
+        retries = settings.scraper.retry_attempts - 1
+    attempt = 0
+    while True:
+        try:
+            return await fetch_once(client, url)
+        except RetryableFetchError as e:
+            attempt += 1
+            if attempt > retries:
+                raise
+            # breaker باز یعنی درخواستی نرفته، پس از بودجه کم نمی‌شود
+            budget = current_budget.get()
+            if budget is not None and not isinstance(e, CircuitOpenError) and not budget.try_spend():
+                raise
+            await asyncio.sleep(backoff_delay(attempt, e.retry_after))
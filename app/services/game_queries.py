@@ -0,0 +1,169 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from datetime import date
+from typing import Literal, Optional
+
+from fastapi import HTTPException, Query
+from sqlalchemy import Select, exists, func, literal_column, or_, select
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.models import Game, GameGenre, GamePlatform
+from app.schemas.developer import DeveloperOut
+from app.schemas.game import GameOut
+from app.schemas.genre import GenreOut
+from app.schemas.platform import PlatformOut
+from app.schemas.price_offer import PriceOfferOut
+from app.schemas.publisher import PublisherOut
+from app.utils.pagination import decode_cursor, encode_cursor, keyset_after
+
+SortKey = Literal["title", "release_date", "id"]
+SortOrder = Literal["asc", "desc"]
+
+# باید با عبارت ستون Game.search_vector یکی باشد
+TS_CONFIG = literal_column("'english'::regconfig")
+
+SORT_COLUMNS = {
+    "title": Game.title,
+    "release_date": Game.release_date,
+    "id": Game.id,
+}
+
+
+@dataclass
+class GameFilters:
+    """Query-string filters shared by the /games list endpoints (use with Depends())."""
+
+    publisher_id: Optional[int] = Query(None)
+    developer_id: Optional[int] = Query(None)
+    genre_id: Optional[int] = Query(None)
+    platform_id: Optional[int] = Query(None)
+    released_from: Optional[date] = Query(None, description="Inclusive, YYYY-MM-DD")
+    released_to: Optional[date] = Query(None, description="Inclusive, YYYY-MM-DD")
+
+    def apply(self, stmt: Select) -> Select:
+        if self.publisher_id is not None:
+            stmt = stmt.where(Game.publisher_id == self.publisher_id)
+        if self.developer_id is not None:
+            stmt = stmt.where(Game.developer_id == self.developer_id)
+        if self.genre_id is not None:
+            # از ایندکس (genre_id, game_id) استفاده می‌کند
+            stmt = stmt.where(exists().where(GameGenre.game_id == Game.id, GameGenre.genre_id == self.genre_id))
+        if self.platform_id is not None:
+            stmt = stmt.where(exists().where(GamePlatform.game_id == Game.id, GamePlatform.platform_id == self.platform_id))
+        if self.released_from is not None:
+            stmt = stmt.where(Game.release_date >= self.released_from)
+        if self.released_to is not None:
+            stmt = stmt.where(Game.release_date <= self.released_to)
+        return stmt
+
+
+def _key_value(sort: SortKey, game: Game):
+    return getattr(game, sort)
+
+
+def keyset_page(stmt: Select, sort: SortKey, order: SortOrder, cursor: str | None, limit: int) -> Select:
+    """
+    Order `stmt` by (sort key, id) and, given a cursor from `next_cursor`,
+    continue strictly after it. Selects `limit + 1` rows so the caller can
+    tell whether another page exists. Raises ValueError for a bad cursor.
+    """
+    key = SORT_COLUMNS[sort]
+    descending = order == "desc"
+    if cursor:
+        pos = decode_cursor(cursor)
+        if pos.get("s") != sort or pos.get("o") != order or not isinstance(pos.get("i"), int):
+            raise ValueError("Cursor does not match sort/order")
+        value = pos.get("k")
+        # کلید id همان i است؛ بقیه رشته یا null‌اند (هرگز مستقیم از cursor به SQL نمی‌رود)
+        if sort == "id":
+            if not isinstance(value, int):
+                raise ValueError("Bad cursor key")
+        elif value is not None and not isinstance(value, str):
+            raise ValueError("Bad cursor key")
+        if value is not None and sort == "release_date":
+            value = date.fromisoformat(value)
+        stmt = stmt.where(keyset_after(key, Game.id, value, pos["i"], descending))
+    if key is Game.id:
+        order_by = [Game.id.desc() if descending else Game.id]
+    else:
+        # جای NULL صریح است (پیش‌فرض Postgres) تا با keyset_after روی هر دیتابیسی جور باشد
+        order_by = [key.desc().nulls_first(), Game.id.desc()] if descending else [key.asc().nulls_last(), Game.id]
+    return stmt.order_by(*order_by).limit(limit + 1)
+
+
+def next_cursor(rows: list[Game], sort: SortKey, order: SortOrder, limit: int) -> str | None:
+    """Cursor for the page after `rows` (as fetched by keyset_page), or None on the last page."""
+    if len(rows) <= limit:
+        return None
+    last = rows[limit - 1]
+    return encode_cursor({"s": sort, "o": order, "k": _key_value(sort, last), "i": last.id})
+
+
+def search_games(q: str, filters: GameFilters, limit: int, offset: int = 0) -> Select:
+    """
+    Ranked search: full-text match on `search_vector` (GIN) or trigram
+    similarity on the title (GIN gin_trgm_ops, catches typos). Rows are
+    (Game, rank), best first.
+    """
+    query = func.websearch_to_tsquery(TS_CONFIG, q)
+    rank = (func.ts_rank_cd(Game.search_vector, query) + func.similarity(Game.title, q)).label("rank")
+    stmt = select(Game, rank).where(or_(Game.search_vector.op("@@")(query), Game.title.op("%")(q)))
+    return filters.apply(stmt).order_by(rank.desc(), Game.id).offset(offset).limit(limit)
+
+
+EXPANDABLE = ("genres", "platforms", "publisher", "developer", "price_offers")
+
+
+def parse_expand(expand: str | None) -> set[str]:
+    """`expand=genres,publisher` -> {"genres", "publisher"}; ValueError for unknown names."""
+    names = {n.strip() for n in (expand or "").split(",") if n.strip()}
+    unknown = names.difference(EXPANDABLE)
+    if unknown:
+        raise ValueError(f"Unknown expand: {', '.join(sorted(unknown))} (allowed: {', '.join(EXPANDABLE)})")
+    return names
+
+
+def expand_query(
+    expand: Optional[str] = Query(None, description=f"Comma-separated relations to embed: {','.join(EXPANDABLE)}"),
+) -> set[str]:
+    """Dependency form of parse_expand (400 on unknown names)."""
+    try:
+        return parse_expand(expand)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def expand_options(expand: set[str]) -> list:
+    """
+    Loader options for `expand`: many-to-one relations are joined into the
+    main query and each collection costs one extra SELECT ... IN for the
+    whole page, so the query count doesn't grow with the page size.
+    """
+    options = []
+    if "publisher" in expand:
+        options.append(joinedload(Game.publisher))
+    if "developer" in expand:
+        options.append(joinedload(Game.developer))
+    if "genres" in expand:
+        options.append(selectinload(Game.genres).joinedload(GameGenre.genre))
+    if "platforms" in expand:
+        options.append(selectinload(Game.platforms).joinedload(GamePlatform.platform))
+    if "price_offers" in expand:
+        options.append(selectinload(Game.price_offers))
+    return options
+
+
+def game_view(game: Game, expand: set[str]) -> dict:
+    """GameOut fields plus the expanded relations (only those loaded by expand_options)."""
+    data = GameOut.model_validate(game).model_dump()
+    if "publisher" in expand:
+        data["publisher"] = PublisherOut.model_validate(game.publisher) if game.publisher else None
+    if "developer" in expand:
+        data["developer"] = DeveloperOut.model_validate(game.developer) if game.developer else None
+    if "genres" in expand:
+        data["genres"] = sorted((GenreOut.model_validate(link.genre) for link in game.genres), key=lambda g: g.name)
+    if "platforms" in expand:
+        data["platforms"] = sorted((PlatformOut.model_validate(link.platform) for link in game.platforms), key=lambda p: p.name)
+    if "price_offers" in expand:
+        data["price_offers"] = [PriceOfferOut.model_validate(o) for o in sorted(game.price_offers, key=lambda o: o.scraped_at)]
+    return data
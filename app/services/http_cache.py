@@ -0,0 +1,138 @@
+from __future__ import annotations
+import hashlib, json, os, threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+import httpx
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    encoding: str | None
+    etag: str | None
+    last_modified: str | None
+
+    @property
+    def text(self) -> str:
+        return self.body.decode(self.encoding or "utf-8", errors="replace")
+
+    def validators(self) -> dict[str, str]:
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """
+    Persistent on-disk response cache keyed by URL.
+
+    Each entry is a `<key>.body` file plus a `<key>.json` file holding the
+    validators; the body file's mtime doubles as the LRU timestamp so the
+    eviction order survives restarts.
+    """
+
+    def __init__(self, directory: str | Path, max_bytes: int) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._index: OrderedDict[str, int] = OrderedDict()  # key -> size, least recently used first
+        self._size = 0
+        self._lock = threading.Lock()
+        self._load_index()
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _paths(self, key: str) -> tuple[Path, Path]:
+        return self.directory / f"{key}.body", self.directory / f"{key}.json"
+
+    def _load_index(self) -> None:
+        entries = []
+        for meta_path in self.directory.glob("*.json"):
+            body_path = meta_path.with_suffix(".body")
+            try:
+                body_stat = body_path.stat()
+                size = body_stat.st_size + meta_path.stat().st_size
+            except FileNotFoundError:
+                meta_path.unlink(missing_ok=True)
+                continue
+            entries.append((body_stat.st_mtime, meta_path.stem, size))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._size += size
+        with self._lock:
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._size > self.max_bytes and self._index:
+            key, size = self._index.popitem(last=False)
+            self._size -= size
+            for path in self._paths(key):
+                path.unlink(missing_ok=True)
+
+    def get(self, url: str) -> CachedResponse | None:
+        key = self._key(url)
+        with self._lock:
+            if key not in self._index:
+                return None
+            self._index.move_to_end(key)
+        body_path, meta_path = self._paths(key)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            body = body_path.read_bytes()
+            os.utime(body_path)
+        except (FileNotFoundError, ValueError):
+            self.discard(url)
+            return None
+        return CachedResponse(
+            body=body,
+            encoding=meta.get("encoding"),
+            etag=meta.get("etag"),
+            last_modified=meta.get("last_modified"),
+        )
+
+    def put(self, url: str, resp: httpx.Response) -> None:
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            # بدون validator امکان درخواست شرطی نیست؛ ذخیره بی‌فایده است
+            # ورودی قبلی هم دیگر معتبر نیست (validatorهای کهنه نفرستیم)
+            self.discard(url)
+            return
+        key = self._key(url)
+        body_path, meta_path = self._paths(key)
+        meta = json.dumps({
+            "url": url,
+            "encoding": resp.encoding,
+            "etag": etag,
+            "last_modified": last_modified,
+        }).encode("utf-8")
+        size = len(resp.content) + len(meta)
+        if size > self.max_bytes:
+            self.discard(url)
+            return
+
+        # نوشتن اتمیک: اول body، بعد meta (وجود meta یعنی ورودی کامل است)
+        for path, data in ((body_path, resp.content), (meta_path, meta)):
+            tmp = path.with_suffix(path.suffix + ".tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+
+        with self._lock:
+            self._size -= self._index.pop(key, 0)
+            self._index[key] = size
+            self._size += size
+            self._evict()
+
+    def discard(self, url: str) -> None:
+        key = self._key(url)
+        with self._lock:
+            self._size -= self._index.pop(key, 0)
+        for path in self._paths(key):
+            path.unlink(missing_ok=True)
@@ -0,0 +1,52 @@
+from __future__ import annotations
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+import httpx
+
+from app.core.config import settings
+
+_client: httpx.AsyncClient | None = None
+
+
+def build_client() -> httpx.AsyncClient:
+    cfg = settings.scraper
+    return httpx.AsyncClient(
+        base_url=cfg.base_url.rstrip("/"),
+        follow_redirects=True,
+        http2=cfg.http2,
+        timeout=cfg.request_timeout,
+        limits=httpx.Limits(
+            max_connections=cfg.max_connections,
+            max_keepalive_connections=cfg.max_keepalive_connections,
+            keepalive_expiry=cfg.keepalive_expiry,
+        ),
+    )
+
+
+async def open_client() -> httpx.AsyncClient:
+    """Create the process-wide client; called from app startup."""
+    global _client
+    if _client is None:
+        _client = build_client()
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+@asynccontextmanager
+async def scraper_client() -> AsyncIterator[httpx.AsyncClient]:
+    """
+    Yield the shared client when the app has opened one, so back-to-back
+    scrapes reuse warm DNS/TLS/HTTP2 connections. Outside the app (scripts,
+    benchmarks) a temporary client is built and closed on exit.
+    """
+    if _client is not None:
+        yield _client
+        return
+    async with build_client() as client:
+        yield client
@@ -0,0 +1,140 @@
+from __future__ import annotations
+import asyncio, uuid
+from collections import OrderedDict
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.services.profiling import profiled
+from app.services.scraper import scrape_and_upsert
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+@dataclass
+class ScrapeJob:
+    id: str
+    params: dict[str, Any]
+    status: str = "pending"  # pending | running | succeeded | failed | cancelled
+    progress: dict[str, Any] = field(default_factory=dict)
+    result: dict | None = None
+    error: str | None = None
+    created_at: datetime = field(default_factory=_now)
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    # profile=True: کل اجرا با cProfile؛ نام پروفایل ذخیره‌شده در `profile_name`
+    profile: bool = False
+    profile_name: str | None = None
+    task: asyncio.Task | None = field(default=None, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed", "cancelled")
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "params": self.params,
+            "progress": dict(self.progress),
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "profile": self.profile_name,
+        }
+
+
+class ScrapeJobManager:
+    """
+    Runs scrapes as tasks on the app's own event loop. At most one scrape
+    runs at a time: starting while one is active returns the active job
+    instead of launching a second crawl against the same rows (callers
+    compare its `params` with `params()` of their own request).
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession], history: int = 50) -> None:
+        self._session_factory = session_factory
+        self._history = history
+        self._jobs: OrderedDict[str, ScrapeJob] = OrderedDict()
+        self._active: ScrapeJob | None = None
+
+    @staticmethod
+    def params(all_pages: bool | None = None) -> dict[str, Any]:
+        """Effective job params for a request (defaults resolved, so jobs compare by value)."""
+        return {"all_pages": settings.scraper.crawl_all_pages if all_pages is None else all_pages}
+
+    def start(self, all_pages: bool | None = None, profile: bool = False) -> tuple[ScrapeJob, bool]:
+        """Return `(job, created)`; `created` is False when an active job was reused."""
+        if self._active is not None and not self._active.finished:
+            return self._active, False
+        job = ScrapeJob(id=uuid.uuid4().hex, params=self.params(all_pages), profile=profile)
+        self._jobs[job.id] = job
+        while len(self._jobs) > self._history:
+            self._jobs.popitem(last=False)
+        self._active = job
+        job.task = asyncio.create_task(self._run(job))
+        return job, True
+
+    async def _run(self, job: ScrapeJob) -> None:
+        job.status = "running"
+        job.started_at = _now()
+        try:
+            async with profiled("scrape", job.id) if job.profile else nullcontext() as name:
+                job.profile_name = name
+                if job.profile and name is None:
+                    # profile دیگری در همین لحظه شروع شده بود؛ اسکرپ بدون profile اجرا می‌شود
+                    job.progress["profile_skipped"] = "another profile was already running"
+                async with self._session_factory() as session:
+                    job.result = await scrape_and_upsert(session, progress=job.progress, **job.params)
+            job.status = "succeeded"
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+        except Exception as e:
+            job.status = "failed"
+            job.error = f"{type(e).__name__}: {e}"
+        finally:
+            job.finished_at = _now()
+            if self._active is job:
+                self._active = None
+
+    async def wait(self, job: ScrapeJob) -> ScrapeJob:
+        if job.task is not None:
+            # asyncio.wait: اگر درخواستِ منتظر قطع شد، خود اسکرپ ادامه پیدا کند
+            await asyncio.wait({job.task})
+        return job
+
+    def get(self, job_id: str) -> ScrapeJob | None:
+        return self._jobs.get(job_id)
+
+    def list(self) -> list[ScrapeJob]:
+        return list(reversed(self._jobs.values()))
+
+    def cancel(self, job_id: str) -> bool:
+        job = self._jobs.get(job_id)
+        if job is None or job.finished or job.task is None:
+            return False
+        job.task.cancel()
+        if job.status == "pending":
+            # task هنوز اجرا نشده، پس finally در _run هم اجرا نمی‌شود
+            job.status = "cancelled"
+            job.finished_at = _now()
+            if self._active is job:
+                self._active = None
+        return True
+
+    async def shutdown(self) -> None:
+        if self._active is not None and self._active.task is not None:
+            self._active.task.cancel()
+            await asyncio.gather(self._active.task, return_exceptions=True)
+
+
+job_manager = ScrapeJobManager(AsyncSessionLocal)
@@ -0,0 +1,244 @@
+from __future__ import annotations
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Iterable
+from urllib.parse import urlsplit
+
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Metric(ABC):
+    """
+    Base for the in-process metrics below. Everything is updated from the
+    event loop only, so there are no locks: an observation is a dict lookup
+    and a couple of additions.
+    """
+
+    type_: str
+
+    def __init__(self, name: str, help_: str, labels: Iterable[str] = ()) -> None:
+        self.name = name
+        self.help = help_
+        self.label_names = tuple(labels)
+
+    @abstractmethod
+    def samples(self) -> Iterable[str]:
+        """Exposition lines for this metric (without HELP/TYPE)."""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type_}", *self.samples()]
+        return "\n".join(lines) + "\n"
+
+
+class Counter(Metric):
+    type_ = "counter"
+
+    def __init__(self, name: str, help_: str, labels: Iterable[str] = ()) -> None:
+        super().__init__(name, help_, labels)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{_labels(self.label_names, labels)} {_num(value)}"
+
+
+class Gauge(Metric):
+    """Gauge series read at scrape time from callbacks (e.g. pool state), so they cost nothing in between."""
+
+    type_ = "gauge"
+
+    def __init__(self, name: str, help_: str, labels: Iterable[str] = ()) -> None:
+        super().__init__(name, help_, labels)
+        self._fns: dict[tuple[str, ...], Callable[[], float | None]] = {}
+
+    def track(self, fn: Callable[[], float | None], *labels: str) -> None:
+        self._fns[labels] = fn
+
+    def samples(self) -> Iterable[str]:
+        for labels, fn in sorted(self._fns.items(), key=lambda kv: kv[0]):
+            value = fn()
+            if value is not None:
+                yield f"{self.name}{_labels(self.label_names, labels)} {_num(value)}"
+
+
+class Histogram(Metric):
+    type_ = "histogram"
+
+    def __init__(self, name: str, help_: str, buckets: Iterable[float], labels: Iterable[str] = ()) -> None:
+        super().__init__(name, help_, labels)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [شمارش هر bucket (غیرتجمعی)..., شمارش کل, مجموع]
+        self._series: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 2)
+        i = bisect_left(self.buckets, value)
+        if i < len(self.buckets):
+            series[i] += 1
+        series[-2] += 1
+        series[-1] += value
+
+    def time(self, *labels: str) -> "_Timer":
+        return _Timer(self, labels)
+
+    def samples(self) -> Iterable[str]:
+        for labels, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets, series):
+                cumulative += n
+                le = 'le="%s"' % _num(bound)
+                yield f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}"
+            le = 'le="+Inf"'
+            yield f"{self.name}_bucket{_labels(self.label_names, labels, le)} {int(series[-2])}"
+            yield f"{self.name}_count{_labels(self.label_names, labels)} {int(series[-2])}"
+            yield f"{self.name}_sum{_labels(self.label_names, labels)} {_num(series[-1])}"
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram: Histogram, labels: tuple[str, ...]) -> None:
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name!r} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        return "".join(m.render() for m in self._metrics.values())
+
+
+registry = Registry()
+
+http_request_seconds: Histogram = registry.register(Histogram(
+    "http_request_duration_seconds", "API request latency by route template",
+    labels=("method", "route", "status"), buckets=settings.metrics.latency_buckets,
+))
+scraper_stage_seconds: Histogram = registry.register(Histogram(
+    "scraper_stage_duration_seconds", "Time spent per scraper stage (fetch, parse, enrich, upsert)",
+    labels=("stage",), buckets=settings.metrics.latency_buckets,
+))
+scraper_responses: Counter = registry.register(Counter(
+    "scraper_http_responses_total", "Upstream responses by host and status (status=error: transport failure)",
+    labels=("host", "status"),
+))
+scraper_bytes: Counter = registry.register(Counter(
+    "scraper_downloaded_bytes_total", "Response body bytes downloaded by the scraper", labels=("host",),
+))
+
+
+def record_response(url: str, status: int | None, size: int = 0) -> None:
+    """Count one upstream response (status None = transport error) and its body size."""
+    host = urlsplit(url).hostname or ""
+    scraper_responses.inc(host, str(status) if status is not None else "error")
+    if size:
+        scraper_bytes.inc(host, amount=size)
+
+
+POOL_LABELS = ("role", "engine")
+db_pool_checked_out: Gauge = registry.register(Gauge(
+    "db_pool_checked_out", "Connections currently checked out of the pool", labels=POOL_LABELS,
+))
+db_pool_overflow: Gauge = registry.register(Gauge(
+    "db_pool_overflow", "Connections open beyond pool_size (negative: unused pool slots)", labels=POOL_LABELS,
+))
+db_pool_size: Gauge = registry.register(Gauge("db_pool_size", "Configured pool size", labels=POOL_LABELS))
+
+
+def register_pool(pool, role: str, engine: str) -> None:
+    """
+    Export a SQLAlchemy pool's state under (role, engine), e.g.
+    ("replica", "db2:5432/epic_games"); pools without a stat (NullPool,
+    StaticPool) just don't report it.
+    """
+    for gauge, stat in ((db_pool_checked_out, "checkedout"), (db_pool_overflow, "overflow"), (db_pool_size, "size")):
+        fn = getattr(pool, stat, None)
+        if callable(fn):
+            gauge.track(fn, role, engine)
+
+
+def _route_template(scope: Scope) -> str:
+    # از قبل تطبیق داده می‌شود: hit و 304 در ResponseCacheMiddleware به router نمی‌رسند و scope["route"] ندارند
+    router = getattr(scope.get("app"), "router", None)
+    partial = None
+    for route in getattr(router, "routes", ()):
+        match, _ = route.matches(scope)
+        if match is Match.FULL:
+            return route.path
+        if match is Match.PARTIAL and partial is None:
+            partial = route.path
+    return partial or "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Records `http_request_duration_seconds` per route template (not the raw
+    path, so ids don't explode the label set), matched against the app's
+    routes before the request runs so cached responses are labelled too.
+    Unmatched paths share one label.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.metrics.enabled:
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        route = _route_template(scope)
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_request_seconds.observe(time.perf_counter() - started, scope["method"], route, str(status))
@@ -0,0 +1,46 @@
+from __future__ import annotations
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, TypeVar
+
+from app.core.config import settings
+from app.services.metrics import scraper_stage_seconds
+
+T = TypeVar("T")
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def get_parse_pool() -> ProcessPoolExecutor | None:
+    """Lazily start the parser processes; `parse_workers: 0` disables the pool."""
+    global _pool
+    if _pool is None and settings.scraper.parse_workers > 0:
+        _pool = ProcessPoolExecutor(max_workers=settings.scraper.parse_workers)
+    return _pool
+
+
+def shutdown_parse_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def run_parser(fn: Callable[..., T], *args) -> T:
+    """
+    Run a parser from `app.services.parsers` off the event loop: in the
+    process pool when enabled, otherwise in the default thread executor.
+    """
+    global _pool
+    loop = asyncio.get_running_loop()
+    pool = get_parse_pool()
+    try:
+        # شامل انتظار در صف pool هم می‌شود
+        with scraper_stage_seconds.time("parse"):
+            return await loop.run_in_executor(pool, fn, *args)
+    except BrokenProcessPool:
+        # یک worker کرش کرده؛ pool بعدی از نو ساخته می‌شود
+        if _pool is pool:
+            _pool = None
+        raise
@@ -0,0 +1,206 @@
+"""
+Pure HTML parsers. They run inside the parse process pool, so this module
+must stay importable without app settings, DB or HTTP clients, and must only
+return plain picklable data.
+"""
+from __future__ import annotations
+import json, re
+
+from bs4 import BeautifulSoup
+
+_RELEASE_DATE_RE = re.compile(r"Release Date", re.I)
+_ISO_DATE_RE = re.compile(r"(\d{4}-\d{2}-\d{2})")
+
+# Epic product pages ship their react-query cache (or Next.js props) inline;
+# the JSON value starts right after one of these markers.
+_STATE_MARKERS = (
+    "window.__REACT_QUERY_INITIAL_QUERIES__",
+    'id="__NEXT_DATA__"',
+)
+_STATE_START_RE = re.compile(r"\s*(?:=|[^>]*>)\s*")
+_OFFER_KEYS = ("description", "releaseDate", "price", "tags", "seller", "developerDisplayName", "publisherDisplayName")
+
+
+def parse_browse_html(html: str) -> list[dict]:
+    soup = BeautifulSoup(html, "lxml")
+    cards = soup.select('[data-component="BrowseGrid"] a[href*="/p/"], a[href*="/product/"]') or soup.select("a.css-1n1")  # fallback
+    results: list[dict] = []
+    seen: set[str] = set()
+    for a in cards:
+        href = a.get("href") or ""
+        slug = href.rstrip("/").split("/")[-1]
+        title = (a.get_text(strip=True) or slug).strip()
+        if not slug or slug in seen:
+            continue
+        seen.add(slug)
+        results.append({
+            "slug": slug,
+            "title": title,
+        })
+    return results
+
+
+def extract_embedded_state(html: str) -> dict | list | None:
+    """Decode the inline page-state JSON without building a DOM."""
+    decoder = json.JSONDecoder()
+    for marker in _STATE_MARKERS:
+        idx = html.find(marker)
+        if idx == -1:
+            continue
+        m = _STATE_START_RE.match(html, idx + len(marker))
+        if not m:
+            continue
+        try:
+            state, _ = decoder.raw_decode(html, m.end())
+        except ValueError:
+            continue
+        return state
+    return None
+
+
+def _find_offer(state: dict | list) -> dict | None:
+    """Pick the dict that looks most like a catalog offer (title + most offer keys)."""
+    best, best_score = None, 1
+    stack = [state]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if "title" in node:
+                score = sum(1 for k in _OFFER_KEYS if node.get(k))
+                if score > best_score:
+                    best, best_score = node, score
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return best
+
+
+def _custom_attribute(offer: dict, key: str) -> str | None:
+    for attr in offer.get("customAttributes") or []:
+        if isinstance(attr, dict) and attr.get("key") == key:
+            return attr.get("value")
+    return None
+
+
+def _tag_names(offer: dict, group: str) -> list[str]:
+    names = []
+    for tag in offer.get("tags") or []:
+        if isinstance(tag, dict) and tag.get("groupName") == group and tag.get("name"):
+            names.append(tag["name"])
+    return sorted(set(names))
+
+
+def _offer_price(offer: dict) -> dict | None:
+    total = (offer.get("price") or {}).get("totalPrice")
+    if not isinstance(total, dict):
+        return None
+    groups = (offer.get("promotions") or {}).get("promotionalOffers") or []
+    # اولین promo فعال، از هر گروهی که باشد
+    window = next((promo for group in groups for promo in group.get("promotionalOffers") or []), {})
+    return {
+        "original_cents": total.get("originalPrice"),
+        "discounted_cents": total.get("discountPrice"),
+        "currency": total.get("currencyCode") or "USD",
+        "starts_at": window.get("startDate"),
+        "ends_at": window.get("endDate"),
+    }
+
+
+def parse_offer(offer: dict) -> dict:
+    """Map an Epic catalog offer object onto the scraper's item fields."""
+    rd = offer.get("releaseDate") or offer.get("effectiveDate")
+    m = _ISO_DATE_RE.search(rd) if isinstance(rd, str) else None
+    seller = offer.get("seller") or {}
+    platforms = _tag_names(offer, "platform")
+    if not platforms and isinstance(offer.get("platform"), list):
+        platforms = sorted(set(offer["platform"]))
+    return {
+        "description": offer.get("description") or None,
+        "release_date": m.group(1) if m else None,
+        "publisher": offer.get("publisherDisplayName") or _custom_attribute(offer, "publisherName") or seller.get("name"),
+        "developer": offer.get("developerDisplayName") or _custom_attribute(offer, "developerName"),
+        "genres": _tag_names(offer, "genre"),
+        "platforms": platforms,
+        "price": _offer_price(offer),
+    }
+
+
+def _offer_slug(offer: dict) -> str | None:
+    for key in ("productSlug", "urlSlug"):
+        slug = offer.get(key)
+        if isinstance(slug, str) and slug:
+            return slug.split("/")[0]
+    for mappings in ((offer.get("catalogNs") or {}).get("mappings"), offer.get("offerMappings")):
+        for mapping in mappings or []:
+            if isinstance(mapping, dict) and mapping.get("pageSlug"):
+                return mapping["pageSlug"]
+    return None
+
+
+def parse_catalog_page(text: str) -> tuple[list[dict], int | None]:
+    """
+    Parse one JSON catalog response into complete items plus the total
+    result count (None when the payload has no paging block).
+    """
+    data = json.loads(text)
+    store = data
+    for key in ("data", "Catalog", "searchStore"):
+        if isinstance(store, dict) and key in store:
+            store = store[key]
+    if isinstance(store, list):
+        elements, total = store, None
+    else:
+        elements = store.get("elements") or store.get("items") or []
+        total = (store.get("paging") or {}).get("total")
+
+    items: list[dict] = []
+    for offer in elements:
+        if not isinstance(offer, dict):
+            continue
+        slug = _offer_slug(offer)
+        if not slug:
+            continue
+        items.append({"slug": slug, "title": (offer.get("title") or slug).strip(), **parse_offer(offer)})
+    return items, total
+
+
+def parse_detail_html(html: str) -> dict:
+    """
+    Fast path: read everything from the embedded page state in one JSON
+    decode. Only pages without it pay for a full DOM walk.
+    """
+    state = extract_embedded_state(html)
+    offer = _find_offer(state) if state is not None else None
+    if offer is not None:
+        return parse_offer(offer)
+    return _parse_detail_dom(html)
+
+
+def _parse_detail_dom(html: str) -> dict:
+    soup = BeautifulSoup(html, "lxml")
+    desc_el = soup.select_one('[data-component="Description"]') or soup.select_one("div[data-testid='pdp-description']")
+    description = desc_el.get_text(" ", strip=True) if desc_el else None
+
+    # تاریخ انتشار (حدسی/وابسته به DOM)
+    rd = None
+    rd_el = soup.find(string=_RELEASE_DATE_RE)
+    if rd_el and rd_el.parent:
+        rd_text = rd_el.parent.get_text(" ", strip=True)
+        m = _ISO_DATE_RE.search(rd_text)
+        if m:
+            rd = m.group(1)
+
+    return {
+        "description": description,
+        "release_date": rd,
+        "publisher": _dom_label_value(soup, "Publisher"),
+        "developer": _dom_label_value(soup, "Developer"),
+    }
+
+
+def _dom_label_value(soup: BeautifulSoup, label: str) -> str | None:
+    # <span>Developer</span><span>Name</span> در بخش About صفحهٔ بازی
+    el = soup.find(string=re.compile(rf"^\s*{label}\s*$"))
+    value = el.parent.find_next_sibling() if el and el.parent else None
+    text = value.get_text(" ", strip=True) if value else ""
+    return text or None
@@ -0,0 +1,213 @@
+from __future__ import annotations
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import GamePriceSummary, PriceOffer
+
+# ستون‌هایی که تغییرشان یک ردیف تازه در تاریخچهٔ قیمت می‌سازد
+PRICE_FIELDS = ("original_price_cents", "discounted_price_cents", "currency", "starts_at", "ends_at")
+
+
+def _to_datetime(value) -> datetime | None:
+    if isinstance(value, datetime) or value is None:
+        return value
+    try:
+        dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def price_row(price: dict | None) -> dict | None:
+    """Map a parsed item's `price` onto PriceOffer columns; None if there is no price."""
+    if not price:
+        return None
+    row = {
+        "original_price_cents": price.get("original_cents"),
+        "discounted_price_cents": price.get("discounted_cents"),
+        "currency": (price.get("currency") or "USD")[:8],
+        "starts_at": _to_datetime(price.get("starts_at")),
+        "ends_at": _to_datetime(price.get("ends_at")),
+    }
+    if row["original_price_cents"] is None and row["discounted_price_cents"] is None:
+        return None
+    return row
+
+
+async def record_price_changes(session: AsyncSession, prices: dict[int, dict], now: datetime) -> int:
+    """
+    Append a PriceOffer row for each game (game_id -> price_row) whose price
+    or offer window differs from its latest recorded row, so an unchanged
+    price costs one index lookup and no write. Returns the number of rows
+    inserted; the caller commits.
+    """
+    if not prices:
+        return 0
+    columns = [getattr(PriceOffer, f) for f in PRICE_FIELDS]
+    latest = (
+        select(PriceOffer.game_id, *columns)
+        .where(PriceOffer.game_id.in_(list(prices)))
+        .order_by(PriceOffer.game_id, PriceOffer.scraped_at.desc())
+        .distinct(PriceOffer.game_id)
+    )
+    current = {r[0]: tuple(r[1:]) for r in (await session.execute(latest)).all()}
+    rows = [
+        {"game_id": game_id, "scraped_at": now, **row}
+        for game_id, row in prices.items()
+        if current.get(game_id) != tuple(row[f] for f in PRICE_FIELDS)
+    ]
+    if rows:
+        await session.execute(insert(PriceOffer).values(rows))
+        await refresh_price_summaries(session, [r["game_id"] for r in rows])
+    return len(rows)
+
+
+# هر ردیف تاریخچه یک «بازه» است تا ردیف بعدی؛ بازهٔ آخر (باز) در summary حساب نمی‌شود
+_REFRESH_SUMMARIES = """
+WITH spans AS (
+    SELECT game_id, currency, original_price_cents AS original,
+           COALESCE(discounted_price_cents, original_price_cents) AS paid,
+           starts_at, ends_at, scraped_at,
+           EXTRACT(EPOCH FROM LEAD(scraped_at) OVER w - scraped_at) AS seconds,
+           ROW_NUMBER() OVER (PARTITION BY game_id ORDER BY scraped_at DESC) AS rn
+    FROM price_offers
+    {where}
+    WINDOW w AS (PARTITION BY game_id ORDER BY scraped_at)
+), agg AS (
+    SELECT game_id,
+           MAX(currency) FILTER (WHERE rn = 1) AS currency,
+           MAX(paid) FILTER (WHERE rn = 1) AS current_price_cents,
+           MAX(original) FILTER (WHERE rn = 1) AS original_price_cents,
+           MAX(starts_at) FILTER (WHERE rn = 1) AS offer_starts_at,
+           MAX(ends_at) FILTER (WHERE rn = 1) AS offer_ends_at,
+           MIN(paid) AS lowest_price_cents,
+           (ARRAY_AGG(scraped_at ORDER BY paid, scraped_at) FILTER (WHERE paid IS NOT NULL))[1] AS lowest_price_at,
+           COALESCE(SUM(CASE WHEN original > 0 THEN (original - paid) * 100.0 / original ELSE 0 END * seconds), 0)
+               AS closed_discount_seconds,
+           COALESCE(SUM(seconds), 0) AS closed_seconds,
+           COUNT(*) AS changes,
+           MIN(scraped_at) AS first_seen_at,
+           MAX(scraped_at) AS last_changed_at
+    FROM spans
+    GROUP BY game_id
+)
+INSERT INTO game_price_summaries (
+    game_id, currency, current_price_cents, original_price_cents, offer_starts_at, offer_ends_at,
+    lowest_price_cents, lowest_price_at, closed_discount_seconds, closed_seconds,
+    changes, first_seen_at, last_changed_at, refreshed_at
+)
+SELECT agg.*, now() FROM agg
+ON CONFLICT (game_id) DO UPDATE SET
+    currency = EXCLUDED.currency,
+    current_price_cents = EXCLUDED.current_price_cents,
+    original_price_cents = EXCLUDED.original_price_cents,
+    offer_starts_at = EXCLUDED.offer_starts_at,
+    offer_ends_at = EXCLUDED.offer_ends_at,
+    lowest_price_cents = EXCLUDED.lowest_price_cents,
+    lowest_price_at = EXCLUDED.lowest_price_at,
+    closed_discount_seconds = EXCLUDED.closed_discount_seconds,
+    closed_seconds = EXCLUDED.closed_seconds,
+    changes = EXCLUDED.changes,
+    first_seen_at = EXCLUDED.first_seen_at,
+    last_changed_at = EXCLUDED.last_changed_at,
+    refreshed_at = EXCLUDED.refreshed_at
+"""
+
+
+async def refresh_price_summaries(session: AsyncSession, game_ids: list[int] | None = None) -> None:
+    """
+    Rebuild game_price_summaries rows from the price history of `game_ids`
+    (every game when None, e.g. for a one-off backfill). The caller commits.
+    """
+    if game_ids is None:
+        await session.execute(text(_REFRESH_SUMMARIES.format(where="")))
+    elif game_ids:
+        await session.execute(
+            text(_REFRESH_SUMMARIES.format(where="WHERE game_id = ANY(:ids)")),
+            {"ids": sorted(set(game_ids))},
+        )
+
+
+def _discount_pct(original: int | None, paid: int | None) -> float:
+    if not original or paid is None:
+        return 0.0
+    return (original - paid) * 100.0 / original
+
+
+def summary_view(summary: GamePriceSummary, now: datetime | None = None) -> dict:
+    """
+    Public shape of a summary. The average discount is time-weighted: the
+    closed spans come precomputed and the open span of the current price is
+    added up to `now`, so the row only needs rewriting when the price moves.
+    """
+    now = now or datetime.now(timezone.utc)
+    current_pct = _discount_pct(summary.original_price_cents, summary.current_price_cents)
+    open_seconds = max(0.0, (now - summary.last_changed_at).total_seconds()) if summary.last_changed_at else 0.0
+    seconds = summary.closed_seconds + open_seconds
+    avg = (summary.closed_discount_seconds + current_pct * open_seconds) / seconds if seconds else current_pct
+    return {
+        "game_id": summary.game_id,
+        "currency": summary.currency,
+        "current_price_cents": summary.current_price_cents,
+        "original_price_cents": summary.original_price_cents,
+        "current_discount_pct": round(current_pct, 2),
+        "offer_starts_at": summary.offer_starts_at,
+        "offer_ends_at": summary.offer_ends_at,
+        "lowest_price_cents": summary.lowest_price_cents,
+        "lowest_price_at": summary.lowest_price_at,
+        "avg_discount_pct": round(avg, 2),
+        "changes": summary.changes,
+        "first_seen_at": summary.first_seen_at,
+        "last_changed_at": summary.last_changed_at,
+    }
+
+
+BUCKETS = {"day": timedelta(days=1), "week": timedelta(weeks=1)}
+# سقف تعداد bucket در یک پاسخ (هر bucket یک lookup روی ایندکس است)
+MAX_BUCKETS = 1000
+
+# برای هر bucket: قیمتی که از قبل در جریان بود + تغییرات داخل همان bucket
+_PRICE_HISTORY = """
+WITH buckets AS (
+    SELECT b AS bucket_start, b + CAST(:step AS interval) AS bucket_end
+    FROM generate_series(date_trunc(:unit, CAST(:start AS timestamptz)), CAST(:end AS timestamptz), CAST(:step AS interval)) AS b
+)
+SELECT bk.bucket_start AS bucket,
+       (ARRAY_AGG(p.currency ORDER BY p.scraped_at DESC))[1] AS currency,
+       (ARRAY_AGG(p.original ORDER BY p.scraped_at DESC))[1] AS original_price_cents,
+       MIN(p.paid) AS min_price_cents,
+       MAX(p.paid) AS max_price_cents,
+       (ARRAY_AGG(p.paid ORDER BY p.scraped_at DESC))[1] AS close_price_cents
+FROM buckets bk
+CROSS JOIN LATERAL (
+    (SELECT currency, original_price_cents AS original,
+            COALESCE(discounted_price_cents, original_price_cents) AS paid, scraped_at
+     FROM price_offers
+     WHERE game_id = :game_id AND scraped_at < bk.bucket_start
+     ORDER BY scraped_at DESC LIMIT 1)
+    UNION ALL
+    (SELECT currency, original_price_cents, COALESCE(discounted_price_cents, original_price_cents), scraped_at
+     FROM price_offers
+     WHERE game_id = :game_id AND scraped_at >= bk.bucket_start AND scraped_at < bk.bucket_end)
+) p
+GROUP BY bk.bucket_start
+ORDER BY bk.bucket_start
+"""
+
+
+async def price_history(
+    session: AsyncSession, game_id: int, bucket: str, start: datetime, end: datetime
+) -> list[dict]:
+    """
+    Downsample a game's price history into `bucket` ("day" or "week")
+    buckets between `start` and `end`, in SQL. Each bucket carries the
+    price in effect when it opened plus every change inside it; buckets
+    before the first recorded price are omitted.
+    """
+    res = await session.execute(
+        text(_PRICE_HISTORY),
+        {"game_id": game_id, "unit": bucket, "step": BUCKETS[bucket], "start": start, "end": end},
+    )
+    return [dict(r) for r in res.mappings()]
@@ -0,0 +1,163 @@
+from __future__ import annotations
+import asyncio, cProfile, hmac, io, pstats, re
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import AsyncIterator
+from urllib.parse import parse_qsl, urlencode
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+TOKEN_HEADER = "x-profile-token"
+TOKEN_PARAM = "profile_token"
+# مسیرهای مدیریت پروفایل‌ها خودشان توکن را چک می‌کنند و profile نمی‌شوند
+ADMIN_PREFIX = "/api/admin"
+SCRAPE_JOBS_PATH = "/api/scrape/jobs"
+SUFFIX = ".prof"
+# مقادیری که FastAPI (pydantic) برای پارامتر bool «true» می‌خواند
+_TRUTHY = {"1", "on", "t", "true", "y", "yes"}
+
+# cProfile در هر thread فقط یک profiler فعال می‌پذیرد
+_active = False
+
+
+def busy() -> bool:
+    """True while a profile is being recorded (a new one would be skipped)."""
+    return _active
+
+
+def _starts_scrape_profile(scope: Scope) -> bool:
+    # این درخواست خودش profile نمی‌شود تا جای profiler برای اجرای اسکرپ خالی بماند
+    if scope["method"] != "POST" or scope["path"] != SCRAPE_JOBS_PATH:
+        return False
+    query = parse_qsl(scope.get("query_string", b"").decode("latin-1"))
+    return any(k == "profile" and v.strip().lower() in _TRUTHY for k, v in query)
+
+
+def token_ok(token: str | None) -> bool:
+    cfg = settings.profiling
+    return bool(cfg.enabled and cfg.token and token) and hmac.compare_digest(token.encode(), cfg.token.encode())
+
+
+def request_token(scope: Scope) -> str | None:
+    token = Headers(scope=scope).get(TOKEN_HEADER)
+    if token:
+        return token
+    for key, value in parse_qsl(scope.get("query_string", b"").decode("latin-1")):
+        if key == TOKEN_PARAM:
+            return value
+    return None
+
+
+def profile_dir() -> Path:
+    return Path(settings.profiling.directory)
+
+
+def _slug(label: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "-", label).strip("-")[:80] or "root"
+
+
+def _save(profiler: cProfile.Profile, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    profiler.dump_stats(str(path))
+    # فقط جدیدترین‌ها نگه داشته می‌شوند
+    for old in sorted(path.parent.glob(f"*{SUFFIX}"), reverse=True)[settings.profiling.keep:]:
+        old.unlink(missing_ok=True)
+
+
+@asynccontextmanager
+async def profiled(kind: str, label: str) -> AsyncIterator[str | None]:
+    """
+    Run the block under cProfile and save the stats as `<dir>/<name>.prof`;
+    yields the profile name, or None when another profile is already
+    running (the block then runs unprofiled).
+
+    cProfile profiles the thread, not the task: other requests the event
+    loop serves meanwhile show up in the profile too, and work done in
+    executor threads/processes (HTML parsing) only as the await around it.
+    """
+    global _active
+    if _active:
+        yield None
+        return
+    name = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S%f}_{kind}_{_slug(label)}"
+    profiler = cProfile.Profile()
+    _active = True
+    profiler.enable()
+    try:
+        yield name
+    finally:
+        profiler.disable()
+        _active = False
+        await asyncio.to_thread(_save, profiler, profile_dir() / f"{name}{SUFFIX}")
+
+
+def list_profiles() -> list[dict]:
+    out = []
+    for path in sorted(profile_dir().glob(f"*{SUFFIX}"), reverse=True):
+        stat = path.stat()
+        _, kind, label = (path.stem.split("_", 2) + ["", ""])[:3]
+        out.append({
+            "name": path.stem,
+            "kind": kind,
+            "label": label,
+            "size": stat.st_size,
+            "created_at": datetime.fromtimestamp(stat.st_mtime, timezone.utc),
+        })
+    return out
+
+
+def profile_path(name: str) -> Path | None:
+    """Path of a saved profile by name, or None (names are never treated as paths)."""
+    if not re.fullmatch(r"[A-Za-z0-9_-]+", name):
+        return None
+    path = profile_dir() / f"{name}{SUFFIX}"
+    return path if path.is_file() else None
+
+
+def render_text(path: Path, sort: str = "cumulative", limit: int = 60) -> str:
+    buf = io.StringIO()
+    pstats.Stats(str(path), stream=buf).sort_stats(sort).print_stats(limit)
+    return buf.getvalue()
+
+
+class ProfilingMiddleware:
+    """
+    Profiles a single request that carries the admin token (X-Profile-Token
+    header or ?profile_token=); the admin routes and a request that starts a
+    profiled scrape (POST /api/scrape/jobs?profile=true) are authorized but
+    not profiled themselves. The token is stripped from the query string
+    and the request is marked no-cache, so it really runs instead of being
+    answered from the response cache; the response carries X-Profile with
+    the saved profile's name. Installed only when profiling is enabled.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(ADMIN_PREFIX) or not token_ok(request_token(scope)):
+            await self.app(scope, receive, send)
+            return
+        query = [(k, v) for k, v in parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True) if k != TOKEN_PARAM]
+        headers = [(k, v) for k, v in scope["headers"] if k.lower() not in (TOKEN_HEADER.encode(), b"cache-control")]
+        # در جا عوض می‌شود تا لایه‌های بیرونی (metrics) هم route تطبیق‌یافته را ببینند
+        scope["query_string"] = urlencode(query).encode("latin-1")
+        scope["headers"] = [*headers, (b"cache-control", b"no-cache")]
+        # POST /scrape/jobs?profile=true از روی همین علامت اجرای اسکرپ را هم profile می‌کند
+        scope["state"] = {**scope.get("state", {}), "profile_authorized": True}
+        if _starts_scrape_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        async with profiled("request", f'{scope["method"]} {scope["path"]}') as name:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start" and name:
+                    message = {**message, "headers": [*message.get("headers", []), (b"x-profile", name.encode())]}
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
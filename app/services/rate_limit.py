@@ -0,0 +1,119 @@
+from __future__ import annotations
+import asyncio, time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+from app.core.config import ScraperSettings, settings
+
+# پاسخ‌هایی که یعنی «آهسته‌تر بفرست»
+THROTTLE_STATUSES = {429, 503}
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Retry-After is either delta-seconds or an HTTP date."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class HostRateLimiter:
+    """
+    Token bucket for one host whose refill rate is tuned with AIMD: every
+    healthy response adds `increase` req/s per second of traffic, while a
+    429/5xx, a transport error or latency above target multiplies the rate
+    by `decrease` (at most once per observed round trip).
+
+    Slots are reserved synchronously, so the bucket needs no lock and is not
+    tied to a particular event loop.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        min_rate: float,
+        max_rate: float,
+        burst: int,
+        increase: float,
+        decrease: float,
+        target_latency: float,
+    ) -> None:
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate = min(max(rate, min_rate), max_rate)
+        self.burst = max(1, burst)
+        self.increase = increase
+        self.decrease = decrease
+        self.target_latency = target_latency
+        self._next_free = 0.0
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+
+    def _reserve(self) -> float:
+        now = time.monotonic()
+        interval = 1.0 / self.rate
+        earliest = now - (self.burst - 1) * interval
+        slot = max(self._next_free, earliest, self._blocked_until)
+        self._next_free = slot + interval
+        return slot - now
+
+    async def acquire(self) -> None:
+        while True:
+            delay = self._reserve()
+            if delay <= 0:
+                return
+            await asyncio.sleep(delay)
+            # اگر در این فاصله Retry-After رسیده باشد، نوبت تازه بگیر
+            if time.monotonic() >= self._blocked_until:
+                return
+
+    def observe(self, status: int | None, latency: float, retry_after: float | None = None) -> None:
+        """Feed back one response; `status=None` means the request failed in transport."""
+        now = time.monotonic()
+        if retry_after:
+            self._blocked_until = max(self._blocked_until, now + retry_after)
+
+        overloaded = status is None or status in THROTTLE_STATUSES or status >= 500
+        if overloaded or latency > self.target_latency:
+            if now - self._last_decrease >= latency:
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                self._last_decrease = now
+        else:
+            self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+
+
+class AdaptiveRateLimiter:
+    """Keeps one HostRateLimiter per host; learned rates persist across runs."""
+
+    def __init__(self, cfg: ScraperSettings) -> None:
+        self.cfg = cfg
+        self._hosts: dict[str, HostRateLimiter] = {}
+
+    def for_url(self, url: str) -> HostRateLimiter:
+        host = urlsplit(url).netloc or urlsplit(self.cfg.base_url).netloc
+        limiter = self._hosts.get(host)
+        if limiter is None:
+            cfg = self.cfg
+            initial = cfg.rate_limit_rps or 1000.0 / max(1, cfg.delay_between_requests_ms)
+            limiter = self._hosts[host] = HostRateLimiter(
+                rate=initial,
+                min_rate=cfg.rate_limit_min_rps,
+                max_rate=cfg.rate_limit_max_rps,
+                burst=cfg.rate_limit_burst or cfg.concurrency,
+                increase=cfg.rate_limit_increase,
+                decrease=cfg.rate_limit_decrease,
+                target_latency=cfg.rate_limit_target_latency_ms / 1000.0,
+            )
+        return limiter
+
+
+rate_limiter = AdaptiveRateLimiter(settings.scraper)
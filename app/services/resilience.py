@@ -0,0 +1,141 @@
+from __future__ import annotations
+import random, time
+from collections import deque
+from contextvars import ContextVar
+from urllib.parse import urlsplit
+
+from app.core.config import ScraperSettings, settings
+
+# وضعیت‌هایی که تکرار درخواست ممکن است نتیجه بدهد؛ بقیهٔ 4xx/5xx نهایی‌اند
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class FetchError(Exception):
+    def __init__(self, url: str, status: int | None, message: str = "") -> None:
+        super().__init__(f"{status or 'transport error'} for {url}{': ' + message if message else ''}")
+        self.url = url
+        self.status = status
+
+
+class TerminalFetchError(FetchError):
+    """Retrying won't help (404 for a dead slug, 403, 410, ...)."""
+
+
+class RetryableFetchError(FetchError):
+    def __init__(self, url: str, status: int | None, message: str = "", retry_after: float | None = None) -> None:
+        super().__init__(url, status, message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(RetryableFetchError):
+    """The host's breaker is open; no request was sent."""
+
+
+def backoff_delay(attempt: int, retry_after: float | None = None) -> float:
+    """Full-jitter exponential backoff, never shorter than Retry-After."""
+    cfg = settings.scraper
+    delay = random.uniform(0, min(cfg.retry_backoff_max_s, cfg.retry_backoff_s * 2 ** (attempt - 1)))
+    return max(delay, retry_after or 0.0)
+
+
+class RetryBudget:
+    """
+    Caps retries for one scrape run at `minimum + ratio * requests`, so a
+    degraded upstream can't multiply the run's traffic.
+    """
+
+    def __init__(self, ratio: float, minimum: int) -> None:
+        self.ratio = ratio
+        self.minimum = minimum
+        self.requests = 0
+        self.retries = 0
+
+    def record_request(self) -> None:
+        self.requests += 1
+
+    def try_spend(self) -> bool:
+        if self.retries >= self.minimum + self.ratio * self.requests:
+            return False
+        self.retries += 1
+        return True
+
+
+# بودجهٔ اجرای فعلی؛ scrape_and_upsert آن را ست می‌کند و taskهای فرزند به ارث می‌برند
+current_budget: ContextVar[RetryBudget | None] = ContextVar("current_budget", default=None)
+
+
+class CircuitBreaker:
+    """
+    Error-rate breaker over the last `window` requests to one host. Once
+    open, requests fail fast for `cooldown` seconds; then a single probe is
+    let through and its outcome closes or re-opens the breaker.
+    """
+
+    def __init__(self, window: int, min_requests: int, error_rate: float, cooldown: float) -> None:
+        self.outcomes: deque[bool] = deque(maxlen=window)
+        self.min_requests = min_requests
+        self.error_rate = error_rate
+        self.cooldown = cooldown
+        self.opened_at: float | None = None
+        self._probe_started: float | None = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.cooldown else "open"
+
+    def remaining(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        now = time.monotonic()
+        # اگر probe قبلی هرگز نتیجه‌ای ثبت نکرد (مثلاً cancel شد)، بعد از cooldown دوباره اجازه بده
+        if state == "half-open" and (self._probe_started is None or now - self._probe_started >= self.cooldown):
+            self._probe_started = now
+            return True
+        return False
+
+    def record(self, ok: bool) -> None:
+        if self.opened_at is not None:
+            if self._probe_started is None:
+                return  # نتیجهٔ دیررسِ درخواستی که قبل از باز شدن breaker رفته بود
+            self._probe_started = None
+            if ok:
+                self.opened_at = None
+                self.outcomes.clear()
+            else:
+                self.opened_at = time.monotonic()
+            return
+        self.outcomes.append(ok)
+        if len(self.outcomes) >= self.min_requests:
+            failures = self.outcomes.count(False)
+            if failures / len(self.outcomes) >= self.error_rate:
+                self.opened_at = time.monotonic()
+
+
+class CircuitBreakers:
+    def __init__(self, cfg: ScraperSettings) -> None:
+        self.cfg = cfg
+        self._hosts: dict[str, CircuitBreaker] = {}
+
+    def for_url(self, url: str) -> CircuitBreaker:
+        host = urlsplit(url).netloc or urlsplit(self.cfg.base_url).netloc
+        breaker = self._hosts.get(host)
+        if breaker is None:
+            cfg = self.cfg
+            breaker = self._hosts[host] = CircuitBreaker(
+                window=cfg.breaker_window,
+                min_requests=cfg.breaker_min_requests,
+                error_rate=cfg.breaker_error_rate,
+                cooldown=cfg.breaker_cooldown_s,
+            )
+        return breaker
+
+
+breakers = CircuitBreakers(settings.scraper)
@@ -0,0 +1,312 @@
+from __future__ import annotations
+import hashlib, json, time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+
+from starlette.datastructures import Headers
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import ResponseCacheSettings, settings
+from app.db.session import pinned_to_primary
+
+# متدهایی که چیزی را تغییر نمی‌دهند
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+@dataclass
+class CachedResponse:
+    status: int
+    headers: list[tuple[str, str]]
+    body: bytes
+    etag: str
+
+    def dumps(self) -> bytes:
+        meta = asdict(self)
+        meta["body"] = self.body.decode("latin-1")
+        return json.dumps(meta).encode("utf-8")
+
+    @classmethod
+    def loads(cls, raw: bytes) -> "CachedResponse":
+        meta = json.loads(raw)
+        meta["body"] = meta["body"].encode("latin-1")
+        meta["headers"] = [tuple(h) for h in meta["headers"]]
+        return cls(**meta)
+
+
+class CacheBackend(ABC):
+    """
+    Storage for cached responses. Invalidation bumps a generation number that
+    is part of every key, so stale entries are simply never read again and
+    age out through TTL/LRU.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> CachedResponse | None: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: CachedResponse, ttl: float) -> None: ...
+
+    @abstractmethod
+    async def generation(self) -> int: ...
+
+    @abstractmethod
+    async def bump(self) -> None:
+        """Start a new generation and record when (see invalidated_at)."""
+
+    @abstractmethod
+    async def invalidated_at(self) -> float:
+        """Wall-clock time of the last bump (0 if never), shared like the generation."""
+
+
+class MemoryBackend(CacheBackend):
+    """Per-process LRU with TTL. With several workers use a shared backend instead."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, CachedResponse]] = OrderedDict()
+        self._generation = 0
+        self._invalidated_at = 0.0
+
+    async def get(self, key: str) -> CachedResponse | None:
+        hit = self._entries.get(key)
+        if hit is None:
+            return None
+        expires_at, value = hit
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: CachedResponse, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def generation(self) -> int:
+        return self._generation
+
+    async def bump(self) -> None:
+        self._generation += 1
+        self._invalidated_at = time.time()
+        # ورودی‌های نسل قبل دیگر خوانده نمی‌شوند؛ حافظه را همین حالا آزاد کن
+        self._entries.clear()
+
+    async def invalidated_at(self) -> float:
+        return self._invalidated_at
+
+
+class RedisBackend(CacheBackend):
+    """Shared between workers/hosts; requires the optional `redis` package."""
+
+    PREFIX = "respcache:"
+
+    def __init__(self, url: str) -> None:
+        try:
+            from redis.asyncio import Redis
+        except ImportError as e:
+            raise RuntimeError("response_cache.backend=redis needs the 'redis' package (pip install redis)") from e
+        self._redis = Redis.from_url(url)
+
+    async def get(self, key: str) -> CachedResponse | None:
+        raw = await self._redis.get(self.PREFIX + key)
+        return CachedResponse.loads(raw) if raw else None
+
+    async def set(self, key: str, value: CachedResponse, ttl: float) -> None:
+        await self._redis.set(self.PREFIX + key, value.dumps(), px=int(ttl * 1000))
+
+    async def generation(self) -> int:
+        return int(await self._redis.get(self.PREFIX + "generation") or 0)
+
+    async def bump(self) -> None:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.incr(self.PREFIX + "generation")
+            pipe.set(self.PREFIX + "invalidated_at", repr(time.time()))
+            await pipe.execute()
+
+    async def invalidated_at(self) -> float:
+        return float(await self._redis.get(self.PREFIX + "invalidated_at") or 0)
+
+
+def _build_backend(cfg: ResponseCacheSettings) -> CacheBackend:
+    if cfg.backend == "memory":
+        return MemoryBackend(cfg.max_entries)
+    if cfg.backend == "redis":
+        if not cfg.redis_url:
+            raise RuntimeError("response_cache.backend=redis needs response_cache.redis_url")
+        return RedisBackend(cfg.redis_url)
+    raise ValueError(f"Unknown response cache backend {cfg.backend!r}")
+
+
+class ResponseCache:
+    def __init__(self, cfg: ResponseCacheSettings) -> None:
+        self.cfg = cfg
+        self._backend: CacheBackend | None = None
+
+    @property
+    def backend(self) -> CacheBackend:
+        # تنبل ساخته می‌شود تا import بدون redis هم کار کند
+        if self._backend is None:
+            self._backend = _build_backend(self.cfg)
+        return self._backend
+
+    def cacheable(self, path: str) -> bool:
+        cfg = self.cfg
+        return (
+            cfg.enabled
+            and any(path.startswith(p) for p in cfg.include_prefixes)
+            and not any(path.startswith(p) for p in cfg.exclude_prefixes)
+        )
+
+    async def invalidate(self) -> None:
+        """Drop every cached response; called after writes and scrape commits."""
+        if self.cfg.enabled:
+            await self.backend.bump()
+
+    async def settling(self) -> bool:
+        """
+        True shortly after an invalidation (on any worker: the time lives in
+        the backend) while read replicas may still lag behind the write;
+        responses are then neither served nor stored, so a stale replica read
+        isn't cached for a whole TTL.
+        """
+        db = settings.database
+        if not db.replica_urls:
+            return False
+        return time.time() - await self.backend.invalidated_at() < db.read_your_writes_s
+
+
+response_cache = ResponseCache(settings.response_cache)
+
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+    return etag in tags
+
+
+class ResponseCacheMiddleware:
+    """
+    Serves repeated GETs from `ResponseCache` with an ETag, answering
+    If-None-Match with 304, and invalidates the cache after any successful
+    write request. Responses other than 200, and bodies larger than
+    `max_body_kb` (e.g. streamed exports), pass through uncached.
+    """
+
+    def __init__(self, app: ASGIApp, cache: ResponseCache | None = None) -> None:
+        self.app = app
+        self.cache = cache or response_cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.cache.cfg.enabled:
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        if method not in SAFE_METHODS:
+            await self._write(scope, receive, send)
+            return
+        if method != "GET" or not self.cache.cacheable(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        if settings.database.replica_urls and (pinned_to_primary(HTTPConnection(scope)) or await self.cache.settling()):
+            # کلاینتِ pin‌شده باید نوشتهٔ خودش را ببیند، نه نسخهٔ cache‌شده از replica
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        if "no-cache" in (headers.get("cache-control") or ""):
+            await self.app(scope, receive, send)
+            return
+        backend = self.cache.backend
+        query = "&".join(sorted(scope.get("query_string", b"").decode("latin-1").split("&")))
+        key = f'{await backend.generation()}:{scope["path"]}?{query}'
+        if_none_match = headers.get("if-none-match")
+
+        hit = await backend.get(key)
+        if hit is not None:
+            await self._replay(hit, if_none_match, send)
+            return
+        await self._fill(scope, receive, send, key, if_none_match)
+
+    async def _write(self, scope: Scope, receive: Receive, send: Send) -> None:
+        status = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+        if 200 <= status < 400:
+            await self.cache.invalidate()
+
+    async def _replay(self, hit: CachedResponse, if_none_match: str | None, send: Send) -> None:
+        if _etag_matches(if_none_match, hit.etag):
+            await send({"type": "http.response.start", "status": 304, "headers": [(b"etag", hit.etag.encode())]})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        raw_headers = [(k.encode("latin-1"), v.encode("latin-1")) for k, v in hit.headers]
+        raw_headers.append((b"etag", hit.etag.encode()))
+        raw_headers.append((b"x-cache", b"HIT"))
+        await send({"type": "http.response.start", "status": hit.status, "headers": raw_headers})
+        await send({"type": "http.response.body", "body": hit.body})
+
+    async def _fill(self, scope: Scope, receive: Receive, send: Send, key: str, if_none_match: str | None) -> None:
+        limit = self.cache.cfg.max_body_kb * 1024
+        start: Message | None = None
+        chunks: list[bytes] = []
+        size = 0
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, size, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start = message
+                if message["status"] != 200:
+                    passthrough = True
+                    await send(message)
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            body = message.get("body", b"")
+            chunks.append(body)
+            size += len(body)
+            if size > limit:
+                # برای cache زیادی بزرگ است؛ هرچه جمع شده را بفرست و بقیه را عبور بده
+                passthrough = True
+                await send(start)
+                await send({"type": "http.response.body", "body": b"".join(chunks), "more_body": message.get("more_body", False)})
+                return
+            if message.get("more_body", False):
+                return
+            body = b"".join(chunks)
+            etag = _etag(body)
+            headers = [
+                (k.decode("latin-1"), v.decode("latin-1"))
+                for k, v in start["headers"]
+                if k.lower() not in (b"etag", b"set-cookie")
+            ]
+            await self.cache.backend.set(key, CachedResponse(200, headers, body, etag), self.cache.cfg.ttl_s)
+            if _etag_matches(if_none_match, etag):
+                await send({"type": "http.response.start", "status": 304, "headers": [(b"etag", etag.encode())]})
+                await send({"type": "http.response.body", "body": b""})
+                return
+            await send({**start, "headers": [*start["headers"], (b"etag", etag.encode()), (b"x-cache", b"MISS")]})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
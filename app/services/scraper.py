@@ -1,403 +1,565 @@
-from __future__ import annotations
-import asyncio, random, re
-from datetime import datetime
-from typing import Iterable
-import httpx
-from bs4 import BeautifulSoup
-from tenacity import retry, stop_after_attempt, wait_random_exponential
-
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from app.core.config import settings
-from app.models import Game, Publisher, Developer, Genre, Platform, PriceOffer
-
-HEADERS_UA = settings.scraper.user_agents or [
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118 Safari/537.36"
-]
-
-def _ua() -> dict[str, str]:
-    return {"User-Agent": random.choice(HEADERS_UA)}
-
-@retry(stop=stop_after_attempt(3), wait=wait_random_exponential(min=1, max=4))
-async def fetch(client: httpx.AsyncClient, url: str) -> str:
-    resp = await client.get(url, headers=_ua(), timeout=settings.scraper.request_timeout)
-    resp.raise_for_status()
-    return resp.text
-
-async def parse_browse(html: str) -> list[dict]:
-    soup = BeautifulSoup(html, "lxml")
-    cards = soup.select('[data-component="BrowseGrid"] a[href*="/p/"], a[href*="/product/"]') or soup.select("a.css-1n1")  # fallback
-    results: list[dict] = []
-    for a in cards[:50]:
-        href = a.get("href") or ""
-        slug = href.rstrip("/").split("/")[-1]
-        title = (a.get_text(strip=True) or slug).strip()
-        if not slug:
-            continue
-        results.append({
-            "slug": slug,
-            "title": title,
-        })
-    return results
-
-async def enrich_game_detail(client: httpx.AsyncClient, item: dict) -> dict:
-    # تلاش برای دریافت جزئیات صفحهٔ بازی (در صورت وجود)
-    url = f'{settings.scraper.base_url}/en-US/p/{item["slug"]}'
-    try:
-        html = await fetch(client, url)
-        soup = BeautifulSoup(html, "lxml")
-        desc_el = soup.select_one('[data-component="Description"]') or soup.select_one("div[data-testid='pdp-description']")
-        description = desc_el.get_text(" ", strip=True) if desc_el else None
-
-        # تاریخ انتشار (حدسی/وابسته به DOM)
-        rd = None
-        rd_el = soup.find(string=re.compile(r"Release Date", re.I))
-        if rd_el and rd_el.parent:
-            rd_text = rd_el.parent.get_text(" ", strip=True)
-            m = re.search(r"(\d{4}-\d{2}-\d{2})", rd_text)
-            if m:
-                rd = m.group(1)
-
-        item.update({
-            "description": description,
-            "release_date": rd
-        })
-    except Exception:
-        pass
-    return item
-
-async def scrape_and_upsert(session: AsyncSession) -> dict:
-    """
-    اسکرپ لیست بازی‌ها و ثبت/به‌روزرسانی در دیتابیس.
-    """
-    base = settings.scraper.base_url.rstrip("/")
-    browse_url = base + settings.scraper.browse_path
-
-    async with httpx.AsyncClient(base_url=base, follow_redirects=True, http2=True) as client:
-        html = await fetch(client, browse_url)
-        items = await parse_browse(html)
-
-        # محدودسازی همزمانی و enrichment
-        sem = asyncio.Semaphore(settings.scraper.concurrency)
-        async def enrich(i):
-            async with sem:
-                await asyncio.sleep(settings.scraper.delay_between_requests_ms / 1000.0)
-                return await enrich_game_detail(client, i)
-
-        detailed = await asyncio.gather(*[enrich(i) for i in items])
-
-    # upsert ساده (slug یکتا)
-    created, updated = 0, 0
-    for it in detailed:
-        slug = it["slug"]
-        title = it.get("title") or slug
-
-        result = await session.execute(select(Game).where(Game.slug == slug))
-        game = result.scalar_one_or_none()
-        if game:
-            game.title = title
-            game.description = it.get("description")
-            # تاریخ انتشار را فقط اگر مقدار معتبر داریم آپدیت کن
-            if it.get("release_date"):
-                game.release_date = it["release_date"]
-            updated += 1
-        else:
-            game = Game(
-                slug=slug,
-                title=title,
-                description=it.get("description"),
-                release_date=it.get("release_date")
-            )
-            session.add(game)
-            created += 1
-
-    await session.commit()
-    return {"created": created, "updated": updated, "total": len(detailed)}
-
-#----------------------------------------------------------------------------------------------------------
-
-# from __future__ import annotations
-
-# import asyncio
-# import random
-# import re
-# import socket
-# from typing import Optional, List
-
-# import aiodns
-# import aiohttp
-# from aiohttp import ClientSession, TCPConnector, ClientTimeout
-# from bs4 import BeautifulSoup
-# from tenacity import retry, stop_after_attempt, wait_random_exponential, retry_if_exception_type
-# import dns.resolver
-
-# from sqlalchemy.ext.asyncio import AsyncSession
-# from sqlalchemy import select
-
-# from app.core.config import settings
-# from app.models import Game
-
-
-# # =========================
-# # Headers / UA
-# # =========================
-# _DEFAULT_UA_POOL = settings.scraper.user_agents or [
-#     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118 Safari/537.36",
-# ]
-
-# def _headers() -> dict[str, str]:
-#     ua = random.choice(_DEFAULT_UA_POOL)
-#     return {
-#         "User-Agent": ua,
-#         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-#         "Accept-Language": "en-US,en;q=0.9",
-#         "Cache-Control": "no-cache",
-#         "Pragma": "no-cache",
-#         "DNT": "1",
-#         "Upgrade-Insecure-Requests": "1",
-#     }
-
-
-# # =========================
-# # Smart DNS adapter for aiohttp
-# # =========================
-# class AioDnsResolverAdapter:
-#     def __init__(self, nameservers: Optional[List[str]] = None) -> None:
-#         loop = asyncio.get_event_loop()
-#         self._resolver = aiodns.DNSResolver(loop=loop, nameservers=nameservers)
-
-#     async def resolve(self, host: str, port: int = 0, family: int = socket.AF_UNSPEC):
-#         addrs: list[dict] = []
-
-#         try:
-#             if family in (socket.AF_UNSPEC, socket.AF_INET):
-#                 a_records = await self._resolver.query(host, "A")
-#                 for r in a_records:
-#                     addrs.append({
-#                         "hostname": host,
-#                         "host": r.host,
-#                         "port": port,
-#                         "family": socket.AF_INET,
-#                         "proto": 0,
-#                         "flags": 0,
-#                     })
-#         except Exception:
-#             pass
-
-#         try:
-#             if family in (socket.AF_UNSPEC, socket.AF_INET6):
-#                 aaaa_records = await self._resolver.query(host, "AAAA")
-#                 for r in aaaa_records:
-#                     addrs.append({
-#                         "hostname": host,
-#                         "host": r.host,
-#                         "port": port,
-#                         "family": socket.AF_INET6,
-#                         "proto": 0,
-#                         "flags": 0,
-#                     })
-#         except Exception:
-#             pass
-
-#         if not addrs:
-#             infos = socket.getaddrinfo(host, port, proto=socket.IPPROTO_TCP)
-#             for _family, _type, _proto, _canonname, sockaddr in infos:
-#                 addrs.append({
-#                     "hostname": host,
-#                     "host": sockaddr[0],
-#                     "port": port,
-#                     "family": _family,
-#                     "proto": _proto,
-#                     "flags": 0,
-#                 })
-
-#         uniq = []
-#         seen = set()
-#         for a in addrs:
-#             k = (a["host"], a["family"])
-#             if k not in seen:
-#                 uniq.append(a)
-#                 seen.add(k)
-#         return uniq
-
-
-# # =========================
-# # Proxy fetcher
-# # =========================
-# async def fetch_free_proxies() -> list[str]:
-#     """
-#     گرفتن پروکسی‌های رایگان از اینترنت (HTTP/HTTPS)
-#     """
-#     url = "https://www.proxy-list.download/api/v1/get?type=https"
-#     async with aiohttp.ClientSession() as s:
-#         try:
-#             async with s.get(url, timeout=15) as r:
-#                 txt = await r.text()
-#                 proxies = [f"http://{p.strip()}" for p in txt.splitlines() if p.strip()]
-#                 return proxies[:50]  # فقط ۵۰ تا
-#         except Exception:
-#             return []
-
-
-# # =========================
-# # aiohttp Session builder
-# # =========================
-# def build_session() -> ClientSession:
-#     smart_dns = getattr(settings.scraper, "smart_dns", None) or []
-#     resolver = AioDnsResolverAdapter(nameservers=smart_dns) if smart_dns else None
-
-#     timeout = ClientTimeout(
-#         total=settings.scraper.request_timeout,
-#         connect=min(15, settings.scraper.request_timeout),
-#         sock_read=settings.scraper.request_timeout,
-#         sock_connect=min(15, settings.scraper.request_timeout),
-#     )
-
-#     connector = TCPConnector(
-#         resolver=resolver,
-#         ssl=None,
-#         limit=0,
-#         force_close=False,
-#         keepalive_timeout=20,
-#         ttl_dns_cache=60,
-#     )
-
-#     return ClientSession(
-#         connector=connector,
-#         timeout=timeout,
-#         headers=_headers(),
-#         trust_env=False,
-#         raise_for_status=False,
-#     )
-
-
-# # =========================
-# # Fetch with retry + proxy rotation
-# # =========================
-# _RETRYABLE_STATUSES = {403, 408, 409, 425, 429, 500, 502, 503, 504}
-
-# @retry(
-#     stop=stop_after_attempt(6),
-#     wait=wait_random_exponential(min=1, max=5),
-#     retry=retry_if_exception_type((aiohttp.ClientError, asyncio.TimeoutError))
-# )
-# async def fetch(session: ClientSession, url: str, proxies: list[str]) -> str:
-#     proxy = random.choice(proxies) if proxies else None
-#     print(f"🌐 Trying proxy: {proxy}")
-
-#     async with session.get(url, proxy=proxy, allow_redirects=True) as resp:
-#         status = resp.status
-#         text = await resp.text(errors="ignore")
-
-#         if status in _RETRYABLE_STATUSES:
-#             raise aiohttp.ClientResponseError(
-#                 resp.request_info, resp.history, status=status, message=f"retryable {status}"
-#             )
-#         if status >= 400:
-#             raise aiohttp.ClientResponseError(
-#                 resp.request_info, resp.history, status=status, message=text[:300]
-#             )
-#         return text
-
-
-# # =========================
-# # Parsers
-# # =========================
-# async def parse_browse(html: str) -> list[dict]:
-#     soup = BeautifulSoup(html, "lxml")
-#     cards = soup.select('[data-component="BrowseGrid"] a[href*="/p/"], a[href*="/product/"]')
-#     results: list[dict] = []
-#     for a in cards[:50]:
-#         href = a.get("href") or ""
-#         slug = href.rstrip("/").split("/")[-1]
-#         title = (a.get_text(strip=True) or slug).strip()
-#         if slug:
-#             results.append({"slug": slug, "title": title})
-#     return results
-
-
-# async def enrich_game_detail(session: ClientSession, item: dict, proxies: list[str]) -> dict:
-#     url = f'{settings.scraper.base_url.rstrip("/")}/en-US/p/{item["slug"]}'
-#     try:
-#         html = await fetch(session, url, proxies)
-#         soup = BeautifulSoup(html, "lxml")
-#         desc_el = soup.select_one('[data-component="Description"]') or soup.select_one("div[data-testid='pdp-description']")
-#         description = desc_el.get_text(" ", strip=True) if desc_el else None
-#         item.update({"description": description})
-#     except Exception as e:
-#         print(f"❌ detail failed for {item['slug']}: {e}")
-#     return item
-
-
-# # =========================
-# # Main scraper
-# # =========================
-# async def scrape_and_upsert(session_db: AsyncSession) -> dict:
-#     base = settings.scraper.base_url.rstrip("/")
-#     browse_url = base + settings.scraper.browse_path
-
-#     created, updated = 0, 0
-
-#     proxies = await fetch_free_proxies()
-#     if not proxies:
-#         print("⚠️ No free proxies found, will use direct connection.")
-
-#     async with build_session() as session_http:
-#         html = await fetch(session_http, browse_url, proxies)
-#         items = await parse_browse(html)
-
-#         sem = asyncio.Semaphore(settings.scraper.concurrency)
-
-#         async def enrich(i):
-#             async with sem:
-#                 await asyncio.sleep(settings.scraper.delay_between_requests_ms / 1000.0)
-#                 return await enrich_game_detail(session_http, i, proxies)
-
-#         detailed = await asyncio.gather(*[enrich(i) for i in items], return_exceptions=False)
-
-#     for it in detailed:
-#         slug = it["slug"]
-#         title = it.get("title") or slug
-#         result = await session_db.execute(select(Game).where(Game.slug == slug))
-#         game = result.scalar_one_or_none()
-
-#         if game:
-#             game.title = title
-#             game.description = it.get("description")
-#             updated += 1
-#         else:
-#             game = Game(slug=slug, title=title, description=it.get("description"))
-#             session_db.add(game)
-#             created += 1
-
-#     await session_db.commit()
-#     return {"created": created, "updated": updated, "total": len(detailed)}
-
-
-# # =========================
-# # DNS debug helper
-# # =========================
-# async def dns_debug(host: str = "store.epicgames.com") -> dict:
-#     smart_ips = []
-#     try:
-#         r = dns.resolver.Resolver()
-#         if getattr(settings.scraper, "smart_dns", None):
-#             r.nameservers = settings.scraper.smart_dns
-#         ans = r.resolve(host, "A")
-#         smart_ips = [rr.to_text() for rr in ans]
-#     except Exception as e:
-#         smart_ips = [f"error: {e}"]
-
-#     sys_ips = []
-#     try:
-#         infos = socket.getaddrinfo(host, 443, proto=socket.IPPROTO_TCP)
-#         sys_ips = list(dict.fromkeys([x[4][0] for x in infos]))
-#     except Exception as e:
-#         sys_ips = [f"error: {e}"]
-
-#     return {
-#         "host": host,
-#         "smart_dns": getattr(settings.scraper, "smart_dns", None),
-#         "smart_resolve": smart_ips,
-#         "system_resolve": sys_ips
-#     }
+from __future__ import annotations
+import asyncio, hashlib, json, time
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import case, func, literal_column, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.core.config import settings
+from app.db.partitions import ensure_price_partitions
+from app.models import Game, Publisher, Developer, Genre, Platform, PriceOffer
+from app.services.dimensions import DimensionCache, item_names, sync_links
+from app.services.http_client import scraper_client
+from app.services.metrics import scraper_stage_seconds
+from app.services.prices import price_row, record_price_changes
+from app.services.response_cache import response_cache
+from app.services.resilience import (
+    CircuitOpenError, RetryableFetchError, RetryBudget, backoff_delay, current_budget,
+)
+from app.services.sources import SourceAdapter, get_source
+
+# فیلدهایی که در اثر انگشت محتوا حساب می‌شوند
+CONTENT_FIELDS = ("title", "description", "release_date", "publisher_id", "developer_id")
+# لینک‌های M2M هم جزو اثر انگشت‌اند (با نام، نه id)
+LINK_FIELDS = ("genres", "platforms")
+
+
+def _to_date(value) -> date | None:
+    if isinstance(value, date) or value is None:
+        return value
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+def _fingerprint(row: dict, links: dict[str, list[str]]) -> str:
+    content = {k: row[k] for k in CONTENT_FIELDS}
+    content.update(links)
+    payload = json.dumps(content, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _game_row(it: dict, now: datetime, dims: DimensionCache) -> dict:
+    slug = it["slug"]
+    row = {
+        "slug": slug,
+        "title": (it.get("title") or slug)[:255],
+        "description": it.get("description"),
+        "release_date": _to_date(it.get("release_date")),
+        "publisher_id": dims.id_of("publisher", next(iter(item_names(it, "publisher")), None)),
+        "developer_id": dims.id_of("developer", next(iter(item_names(it, "developer")), None)),
+    }
+    row["content_hash"] = _fingerprint(row, {f: item_names(it, f) for f in LINK_FIELDS})
+    row["last_scraped_at"] = now
+    row["last_changed_at"] = now
+    return row
+
+def _chunks(rows: list, size: int) -> Iterable[list]:
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+async def _upsert_items(session: AsyncSession, items: list[dict], dims: DimensionCache | None = None) -> dict:
+    """
+    INSERT ... ON CONFLICT (slug) DO UPDATE in chunks of `upsert_batch_size`.
+
+    The update only fires when the content fingerprint differs, or when
+    `last_scraped_at` is older than `touch_interval_hours`; every other
+    existing row is left alone (no dead tuple, no WAL). Counts come back
+    from the database: `xmax = 0` marks an insert and a fresh
+    `last_changed_at` marks a real change.
+
+    Prices go to the price_offers history in the same transaction, but only
+    for games whose price or offer window changed since the last row.
+
+    Publisher/developer/genre/platform names are resolved to ids through
+    `dims` (the run's DimensionCache); genre and platform links are only
+    re-synced for games that were inserted or changed.
+    """
+    now = datetime.now(timezone.utc)
+    touch_before = now - timedelta(hours=settings.scraper.touch_interval_hours)
+    if dims is None:
+        dims = await DimensionCache().load(session)
+    # هر slug فقط یک بار در هر دستور (آخرین مقدار برنده است)
+    by_slug = {it["slug"]: it for it in items}
+    await dims.resolve(session, by_slug.values())
+    rows = [_game_row(it, now, dims) for it in by_slug.values()]
+    prices = {slug: p for slug, it in by_slug.items() if (p := price_row(it.get("price")))}
+    created, updated, unchanged, prices_recorded = 0, 0, 0, 0
+    for chunk in _chunks(rows, settings.scraper.upsert_batch_size):
+        stmt = pg_insert(Game).values(chunk)
+        excluded = stmt.excluded
+        changed = Game.content_hash.is_distinct_from(excluded.content_hash)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Game.slug],
+            set_={
+                "title": excluded.title,
+                "description": excluded.description,
+                # تاریخ انتشار را فقط اگر مقدار معتبر داریم آپدیت کن
+                "release_date": func.coalesce(excluded.release_date, Game.release_date),
+                "publisher_id": func.coalesce(excluded.publisher_id, Game.publisher_id),
+                "developer_id": func.coalesce(excluded.developer_id, Game.developer_id),
+                "content_hash": excluded.content_hash,
+                "last_scraped_at": excluded.last_scraped_at,
+                "last_changed_at": case((changed, excluded.last_changed_at), else_=Game.last_changed_at),
+            },
+            where=or_(changed, Game.last_scraped_at.is_(None), Game.last_scraped_at < touch_before),
+        ).returning(literal_column("xmax = 0").label("inserted"), Game.last_changed_at, Game.id, Game.slug)
+        written = (await session.execute(stmt)).all()
+        n_created = sum(1 for inserted, *_ in written if inserted)
+        n_updated = sum(1 for inserted, changed_at, _, _ in written if not inserted and changed_at == now)
+        created += n_created
+        updated += n_updated
+        unchanged += len(chunk) - n_created - n_updated
+
+        links: dict[str, dict[int, set[int]]] = {f: {} for f in LINK_FIELDS}
+        for inserted, changed_at, game_id, slug in written:
+            if not inserted and changed_at != now:
+                continue
+            it = by_slug[slug]
+            for field in LINK_FIELDS:
+                # آیتمی که جزئیاتش نیامده لینک‌های قبلی‌اش را از دست نمی‌دهد
+                if field in it:
+                    links[field][game_id] = dims.ids_of(field, item_names(it, field))
+        for field, game_links in links.items():
+            await sync_links(session, field, game_links)
+
+        # ردیف‌های بدون تغییر RETURNING ندارند؛ id آن‌ها را جدا بخوان
+        ids = {slug: game_id for _, _, game_id, slug in written}
+        missing = [r["slug"] for r in chunk if r["slug"] in prices and r["slug"] not in ids]
+        if missing:
+            ids.update({slug: game_id for game_id, slug in (await session.execute(
+                select(Game.id, Game.slug).where(Game.slug.in_(missing))
+            )).all()})
+        chunk_prices = {ids[r["slug"]]: prices[r["slug"]] for r in chunk if r["slug"] in prices and r["slug"] in ids}
+        prices_recorded += await record_price_changes(session, chunk_prices, now)
+
+    await session.commit()
+    if created or updated or prices_recorded:
+        await response_cache.invalidate()
+    return {
+        "created": created, "updated": updated, "unchanged": unchanged,
+        "prices_recorded": prices_recorded, "total": len(items),
+    }
+
+async def scrape_and_upsert(
+    session: AsyncSession,
+    all_pages: bool | None = None,
+    source: SourceAdapter | None = None,
+    progress: dict | None = None,
+) -> dict:
+    """
+    اسکرپ لیست بازی‌ها و ثبت/به‌روزرسانی در دیتابیس.
+
+    Items from the source adapter (`scraper.source` by default) stream through
+    a bounded queue into `concurrency` enrich workers, paced by the adaptive
+    per-host rate limiter; finished items are committed in batches of
+    `write_batch_size`, so memory stays flat however many pages the crawl walks.
+
+    Detail fetches that fail with a retryable error are parked on a timer and
+    re-queued later instead of sleeping inside a worker slot; retries are
+    capped by a per-run RetryBudget and the per-host circuit breaker.
+
+    If `progress` is given it is updated in place (discovered/enriched,
+    deferred retries, the running counts and time spent upserting) so callers
+    such as the job manager can report on it.
+    """
+    cfg = settings.scraper
+    if all_pages is None:
+        all_pages = cfg.crawl_all_pages
+    source = source or get_source()
+    # پارتیشن ماه جاری باید پیش از اولین ردیف قیمت وجود داشته باشد
+    await ensure_price_partitions(await session.connection())
+    await session.commit()
+    workers = max(1, cfg.concurrency)
+    todo: asyncio.Queue[tuple[dict, int] | None] = asyncio.Queue(maxsize=cfg.queue_size)
+    done: asyncio.Queue[dict | None] = asyncio.Queue(maxsize=cfg.queue_size)
+    totals = {"created": 0, "updated": 0, "unchanged": 0, "prices_recorded": 0, "total": 0}
+    if progress is None:
+        progress = {}
+    progress.update(discovered=0, enriched=0, deferred=0, gave_up=0, upsert_seconds=0.0, **totals)
+
+    # نام‌ها -> id یک بار برای کل اجرا
+    dims = await DimensionCache().load(session)
+    budget = RetryBudget(cfg.retry_budget_ratio, cfg.retry_budget_min)
+    budget_token = current_budget.set(budget)
+    # آیتم‌هایی که وارد pipeline شده‌اند ولی هنوز به writer نرسیده‌اند (شامل retryهای مؤخر)
+    outstanding = 0
+    settled = asyncio.Event()
+    retry_tasks: set[asyncio.Task] = set()
+
+    def hand_off():
+        nonlocal outstanding
+        outstanding -= 1
+        if outstanding == 0:
+            settled.set()
+
+    async def retry_later(entry: tuple[dict, int], delay: float):
+        await asyncio.sleep(delay)
+        await todo.put(entry)
+
+    async with scraper_client() as client:
+        # هر مرحله با None پایان کارش را به مرحلهٔ بعد اعلام می‌کند
+        async def produce():
+            nonlocal outstanding
+            async for item in source.iter_items(client, all_pages):
+                progress["discovered"] += 1
+                outstanding += 1
+                settled.clear()
+                await todo.put((item, 0))
+            # retryهای مؤخر هنوز ممکن است به todo برگردند
+            while outstanding:
+                await settled.wait()
+            for _ in range(workers):
+                await todo.put(None)
+
+        async def enrich():
+            while (entry := await todo.get()) is not None:
+                item, attempt = entry
+                try:
+                    with scraper_stage_seconds.time("enrich"):
+                        item = await source.enrich(client, item)
+                except RetryableFetchError as e:
+                    attempt += 1
+                    spend = isinstance(e, CircuitOpenError) or budget.try_spend()
+                    if attempt < cfg.retry_attempts and spend:
+                        # به جای خوابیدن در این slot، آیتم را برای بعد کنار بگذار
+                        progress["deferred"] += 1
+                        task = asyncio.create_task(retry_later((item, attempt), backoff_delay(attempt, e.retry_after)))
+                        retry_tasks.add(task)
+                        task.add_done_callback(retry_tasks.discard)
+                        continue
+                    # بدون جزئیات ذخیره می‌شود، مثل قبل وقتی صفحهٔ جزئیات در دسترس نبود
+                    progress["gave_up"] += 1
+                progress["enriched"] += 1
+                await done.put(item)
+                hand_off()
+            await done.put(None)
+
+        async def flush(batch: list[dict]):
+            started = time.perf_counter()
+            _add_counts(totals, await _upsert_items(session, batch, dims))
+            elapsed = time.perf_counter() - started
+            progress["upsert_seconds"] += elapsed
+            scraper_stage_seconds.observe(elapsed, "upsert")
+            progress.update(totals)
+
+        async def write():
+            batch: list[dict] = []
+            finished = 0
+            while finished < workers:
+                item = await done.get()
+                if item is None:
+                    finished += 1
+                    continue
+                batch.append(item)
+                if len(batch) >= cfg.write_batch_size:
+                    await flush(batch)
+                    batch = []
+            if batch:
+                await flush(batch)
+
+        tasks = [asyncio.create_task(produce()), asyncio.create_task(write())]
+        tasks += [asyncio.create_task(enrich()) for _ in range(workers)]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            current_budget.reset(budget_token)
+            tasks += retry_tasks
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    progress.update(requests=budget.requests, retries=budget.retries)
+    return totals
+
+def _add_counts(totals: dict, counts: dict) -> None:
+    for k, v in counts.items():
+        totals[k] = totals.get(k, 0) + v
+
+#----------------------------------------------------------------------------------------------------------
+
+# from __future__ import annotations
+
+# import asyncio
+# import random
+# import re
+# import socket
+# from typing import Optional, List
+
+# import aiodns
+# import aiohttp
+# from aiohttp import ClientSession, TCPConnector, ClientTimeout
+# from bs4 import BeautifulSoup
+# from tenacity import retry, stop_after_attempt, wait_random_exponential, retry_if_exception_type
+# import dns.resolver
+
+# from sqlalchemy.ext.asyncio import AsyncSession
+# from sqlalchemy import select
+
+# from app.core.config import settings
+# from app.models import Game
+
+
+# # =========================
+# # Headers / UA
+# # =========================
+# _DEFAULT_UA_POOL = settings.scraper.user_agents or [
+#     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118 Safari/537.36",
+# ]
+
+# def _headers() -> dict[str, str]:
+#     ua = random.choice(_DEFAULT_UA_POOL)
+#     return {
+#         "User-Agent": ua,
+#         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+#         "Accept-Language": "en-US,en;q=0.9",
+#         "Cache-Control": "no-cache",
+#         "Pragma": "no-cache",
+#         "DNT": "1",
+#         "Upgrade-Insecure-Requests": "1",
+#     }
+
+
+# # =========================
+# # Smart DNS adapter for aiohttp
+# # =========================
+# class AioDnsResolverAdapter:
+#     def __init__(self, nameservers: Optional[List[str]] = None) -> None:
+#         loop = asyncio.get_event_loop()
+#         self._resolver = aiodns.DNSResolver(loop=loop, nameservers=nameservers)
+
+#     async def resolve(self, host: str, port: int = 0, family: int = socket.AF_UNSPEC):
+#         addrs: list[dict] = []
+
+#         try:
+#             if family in (socket.AF_UNSPEC, socket.AF_INET):
+#                 a_records = await self._resolver.query(host, "A")
+#                 for r in a_records:
+#                     addrs.append({
+#                         "hostname": host,
+#                         "host": r.host,
+#                         "port": port,
+#                         "family": socket.AF_INET,
+#                         "proto": 0,
+#                         "flags": 0,
+#                     })
+#         except Exception:
+#             pass
+
+#         try:
+#             if family in (socket.AF_UNSPEC, socket.AF_INET6):
+#                 aaaa_records = await self._resolver.query(host, "AAAA")
+#                 for r in aaaa_records:
+#                     addrs.append({
+#                         "hostname": host,
+#                         "host": r.host,
+#                         "port": port,
+#                         "family": socket.AF_INET6,
+#                         "proto": 0,
+#                         "flags": 0,
+#                     })
+#         except Exception:
+#             pass
+
+#         if not addrs:
+#             infos = socket.getaddrinfo(host, port, proto=socket.IPPROTO_TCP)
+#             for _family, _type, _proto, _canonname, sockaddr in infos:
+#                 addrs.append({
+#                     "hostname": host,
+#                     "host": sockaddr[0],
+#                     "port": port,
+#                     "family": _family,
+#                     "proto": _proto,
+#                     "flags": 0,
+#                 })
+
+#         uniq = []
+#         seen = set()
+#         for a in addrs:
+#             k = (a["host"], a["family"])
+#             if k not in seen:
+#                 uniq.append(a)
+#                 seen.add(k)
+#         return uniq
+
+
+# # =========================
+# # Proxy fetcher
+# # =========================
+# async def fetch_free_proxies() -> list[str]:
+#     """
+#     گرفتن پروکسی‌های رایگان از اینترنت (HTTP/HTTPS)
+#     """
+#     url = "https://www.proxy-list.download/api/v1/get?type=https"
+#     async with aiohttp.ClientSession() as s:
+#         try:
+#             async with s.get(url, timeout=15) as r:
+#                 txt = await r.text()
+#                 proxies = [f"http://{p.strip()}" for p in txt.splitlines() if p.strip()]
+#                 return proxies[:50]  # فقط ۵۰ تا
+#         except Exception:
+#             return []
+
+
+# # =========================
+# # aiohttp Session builder
+# # =========================
+# def build_session() -> ClientSession:
+#     smart_dns = getattr(settings.scraper, "smart_dns", None) or []
+#     resolver = AioDnsResolverAdapter(nameservers=smart_dns) if smart_dns else None
+
+#     timeout = ClientTimeout(
+#         total=settings.scraper.request_timeout,
+#         connect=min(15, settings.scraper.request_timeout),
+#         sock_read=settings.scraper.request_timeout,
+#         sock_connect=min(15, settings.scraper.request_timeout),
+#     )
+
+#     connector = TCPConnector(
+#         resolver=resolver,
+#         ssl=None,
+#         limit=0,
+#         force_close=False,
+#         keepalive_timeout=20,
+#         ttl_dns_cache=60,
+#     )
+
+#     return ClientSession(
+#         connector=connector,
+#         timeout=timeout,
+#         headers=_headers(),
+#         trust_env=False,
+#         raise_for_status=False,
+#     )
+
+
+# # =========================
+# # Fetch with retry + proxy rotation
+# # =========================
+# _RETRYABLE_STATUSES = {403, 408, 409, 425, 429, 500, 502, 503, 504}
+
+# @retry(
+#     stop=stop_after_attempt(6),
+#     wait=wait_random_exponential(min=1, max=5),
+#     retry=retry_if_exception_type((aiohttp.ClientError, asyncio.TimeoutError))
+# )
+# async def fetch(session: ClientSession, url: str, proxies: list[str]) -> str:
+#     proxy = random.choice(proxies) if proxies else None
+#     print(f"🌐 Trying proxy: {proxy}")
+
+#     async with session.get(url, proxy=proxy, allow_redirects=True) as resp:
+#         status = resp.status
+#         text = await resp.text(errors="ignore")
+
+#         if status in _RETRYABLE_STATUSES:
+#             raise aiohttp.ClientResponseError(
+#                 resp.request_info, resp.history, status=status, message=f"retryable {status}"
+#             )
+#         if status >= 400:
+#             raise aiohttp.ClientResponseError(
+#                 resp.request_info, resp.history, status=status, message=text[:300]
+#             )
+#         return text
+
+
+# # =========================
+# # Parsers
+# # =========================
+# async def parse_browse(html: str) -> list[dict]:
+#     soup = BeautifulSoup(html, "lxml")
+#     cards = soup.select('[data-component="BrowseGrid"] a[href*="/p/"], a[href*="/product/"]')
+#     results: list[dict] = []
+#     for a in cards[:50]:
+#         href = a.get("href") or ""
+#         slug = href.rstrip("/").split("/")[-1]
+#         title = (a.get_text(strip=True) or slug).strip()
+#         if slug:
+#             results.append({"slug": slug, "title": title})
+#     return results
+
+
+# async def enrich_game_detail(session: ClientSession, item: dict, proxies: list[str]) -> dict:
+#     url = f'{settings.scraper.base_url.rstrip("/")}/en-US/p/{item["slug"]}'
+#     try:
+#         html = await fetch(session, url, proxies)
+#         soup = BeautifulSoup(html, "lxml")
+#         desc_el = soup.select_one('[data-component="Description"]') or soup.select_one("div[data-testid='pdp-description']")
+#         description = desc_el.get_text(" ", strip=True) if desc_el else None
+#         item.update({"description": description})
+#     except Exception as e:
+#         print(f"❌ detail failed for {item['slug']}: {e}")
+#     return item
+
+
+# # =========================
+# # Main scraper
+# # =========================
+# async def scrape_and_upsert(session_db: AsyncSession) -> dict:
+#     base = settings.scraper.base_url.rstrip("/")
+#     browse_url = base + settings.scraper.browse_path
+
+#     created, updated = 0, 0
+
+#     proxies = await fetch_free_proxies()
+#     if not proxies:
+#         print("⚠️ No free proxies found, will use direct connection.")
+
+#     async with build_session() as session_http:
+#         html = await fetch(session_http, browse_url, proxies)
+#         items = await parse_browse(html)
+
+#         sem = asyncio.Semaphore(settings.scraper.concurrency)
+
+#         async def enrich(i):
+#             async with sem:
+#                 await asyncio.sleep(settings.scraper.delay_between_requests_ms / 1000.0)
+#                 return await enrich_game_detail(session_http, i, proxies)
+
+#         detailed = await asyncio.gather(*[enrich(i) for i in items], return_exceptions=False)
+
+#     for it in detailed:
+#         slug = it["slug"]
+#         title = it.get("title") or slug
+#         result = await session_db.execute(select(Game).where(Game.slug == slug))
+#         game = result.scalar_one_or_none()
+
+#         if game:
+#             game.title = title
+#             game.description = it.get("description")
+#             updated += 1
+#         else:
+#             game = Game(slug=slug, title=title, description=it.get("description"))
+#             session_db.add(game)
+#             created += 1
+
+#     await session_db.commit()
+#     return {"created": created, "updated": updated, "total": len(detailed)}
+
+
+# # =========================
+# # DNS debug helper
+# # =========================
+# async def dns_debug(host: str = "store.epicgames.com") -> dict:
+#     smart_ips = []
+#     try:
+#         r = dns.resolver.Resolver()
+#         if getattr(settings.scraper, "smart_dns", None):
+#             r.nameservers = settings.scraper.smart_dns
+#         ans = r.resolve(host, "A")
+#         smart_ips = [rr.to_text() for rr in ans]
+#     except Exception as e:
+#         smart_ips = [f"error: {e}"]
+
+#     sys_ips = []
+#     try:
+#         infos = socket.getaddrinfo(host, 443, proto=socket.IPPROTO_TCP)
+#         sys_ips = list(dict.fromkeys([x[4][0] for x in infos]))
+#     except Exception as e:
+#         sys_ips = [f"error: {e}"]
+
+#     return {
+#         "host": host,
+#         "smart_dns": getattr(settings.scraper, "smart_dns", None),
+#         "smart_resolve": smart_ips,
+#         "system_resolve": sys_ips
+#     }
@@ -0,0 +1,20 @@
+from app.core.config import settings
+from .base import SourceAdapter
+from .html import HtmlSource
+from .json_catalog import JsonCatalogSource
+
+SOURCES: dict[str, type[SourceAdapter]] = {
+    HtmlSource.name: HtmlSource,
+    JsonCatalogSource.name: JsonCatalogSource,
+}
+
+
+def get_source(name: str | None = None) -> SourceAdapter:
+    name = name or settings.scraper.source
+    try:
+        return SOURCES[name]()
+    except KeyError:
+        raise ValueError(f"Unknown scraper source: {name!r} (expected one of {sorted(SOURCES)})")
+
+
+__all__ = ["SourceAdapter", "HtmlSource", "JsonCatalogSource", "SOURCES", "get_source"]
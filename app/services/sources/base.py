@@ -0,0 +1,22 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from typing import AsyncIterator
+import httpx
+
+
+class SourceAdapter(ABC):
+    """
+    Where scraped games come from. `iter_items` streams item dicts (at least
+    `slug` and `title`); `enrich` fills in the detail fields for one item and
+    is a no-op for sources whose listing already carries them. `enrich` may
+    raise RetryableFetchError to have the pipeline retry the item later.
+    """
+
+    name: str
+
+    @abstractmethod
+    def iter_items(self, client: httpx.AsyncClient, all_pages: bool = False) -> AsyncIterator[dict]:
+        ...
+
+    async def enrich(self, client: httpx.AsyncClient, item: dict) -> dict:
+        return item
@@ -0,0 +1,56 @@
+from __future__ import annotations
+from typing import AsyncIterator
+import httpx
+
+from app.core.config import settings
+from app.services.fetcher import fetch
+from app.services.parse_pool import run_parser
+from app.services.parsers import parse_browse_html, parse_detail_html
+from app.services.resilience import RetryableFetchError
+from app.services.sources.base import SourceAdapter
+
+
+class HtmlSource(SourceAdapter):
+    """Store browse grid pages, enriched one `/en-US/p/{slug}` page per game."""
+
+    name = "html"
+
+    async def iter_items(self, client: httpx.AsyncClient, all_pages: bool = False) -> AsyncIterator[dict]:
+        """
+        Yield browse cards page by page. Without `all_pages` only the configured
+        browse page is read; otherwise `start` is advanced until a page comes back
+        empty or repeats the previous one.
+        """
+        cfg = settings.scraper
+        browse_url = cfg.base_url.rstrip("/") + cfg.browse_path
+        if not all_pages:
+            for item in await run_parser(parse_browse_html, await fetch(client, browse_url)):
+                yield item
+            return
+
+        previous: set[str] = set()
+        for page in range(cfg.max_pages):
+            url = str(httpx.URL(browse_url).copy_merge_params({
+                "start": page * cfg.browse_page_size,
+                "count": cfg.browse_page_size,
+            }))
+            items = await run_parser(parse_browse_html, await fetch(client, url))
+            slugs = {i["slug"] for i in items}
+            if not slugs or slugs <= previous:
+                break
+            previous = slugs
+            for item in items:
+                yield item
+
+    async def enrich(self, client: httpx.AsyncClient, item: dict) -> dict:
+        # تلاش برای دریافت جزئیات صفحهٔ بازی (در صورت وجود)
+        url = f'{settings.scraper.base_url}/en-US/p/{item["slug"]}'
+        try:
+            html = await fetch(client, url, retries=0)
+            item.update(await run_parser(parse_detail_html, html))
+        except RetryableFetchError:
+            # pipeline آن را در صف retry مؤخر می‌گذارد
+            raise
+        except Exception:
+            pass
+        return item
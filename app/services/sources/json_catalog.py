@@ -0,0 +1,46 @@
+from __future__ import annotations
+from typing import AsyncIterator
+import httpx
+
+from app.core.config import settings
+from app.services.fetcher import fetch
+from app.services.parse_pool import run_parser
+from app.services.parsers import parse_catalog_page
+from app.services.sources.base import SourceAdapter
+
+
+class JsonCatalogSource(SourceAdapter):
+    """
+    JSON catalog endpoint that returns `catalog_page_size` fully-described
+    offers per request, paged with `count`/`start`. No per-game detail fetch
+    is needed.
+    """
+
+    name = "json_catalog"
+
+    def _catalog_url(self) -> str:
+        cfg = settings.scraper
+        if not cfg.catalog_url:
+            raise ValueError("scraper.catalog_url must be set to use the json_catalog source")
+        if cfg.catalog_url.startswith(("http://", "https://")):
+            return cfg.catalog_url
+        return cfg.base_url.rstrip("/") + cfg.catalog_url
+
+    async def iter_items(self, client: httpx.AsyncClient, all_pages: bool = False) -> AsyncIterator[dict]:
+        cfg = settings.scraper
+        catalog_url = self._catalog_url()
+        start = 0
+        for _ in range(cfg.max_pages if all_pages else 1):
+            url = str(httpx.URL(catalog_url).copy_merge_params({
+                **cfg.catalog_params,
+                "count": cfg.catalog_page_size,
+                "start": start,
+            }))
+            items, total = await run_parser(parse_catalog_page, await fetch(client, url))
+            if not items:
+                break
+            for item in items:
+                yield item
+            start += cfg.catalog_page_size
+            if total is not None and start >= total:
+                break
@@ -1,13 +1,20 @@
-from typing import AsyncGenerator
-
-from fastapi import Depends
-from sqlalchemy.ext.asyncio import AsyncSession
-
-from app.db.session import get_session
-
-
-async def get_db(session: AsyncSession = Depends(get_session)) -> AsyncGenerator[AsyncSession, None]:
-    """
-    Dependency that provides a DB session to routes/services.
-    """
-    yield session
+from typing import AsyncGenerator
+
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_read_session, get_session
+
+
+async def get_db(session: AsyncSession = Depends(get_session)) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency that provides a DB session to routes/services.
+    """
+    yield session
+
+
+async def get_read_db(session: AsyncSession = Depends(get_read_session)) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Read-only session for GET routes (replica, or the primary right after this client wrote).
+    """
+    yield session
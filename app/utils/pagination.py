@@ -0,0 +1,45 @@
+from __future__ import annotations
+import base64, json
+
+from sqlalchemy import and_, or_, tuple_
+from sqlalchemy.sql.elements import ColumnElement
+
+
+def encode_cursor(payload: dict) -> str:
+    """Opaque, URL-safe cursor for a keyset position."""
+    raw = json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """Inverse of encode_cursor; raises ValueError for anything malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(payload, dict):
+        raise ValueError("Invalid cursor")
+    return payload
+
+
+def keyset_after(key, id_col, key_value, last_id: int, descending: bool = False) -> ColumnElement:
+    """
+    WHERE clause for the rows after (key_value, last_id) in
+    `ORDER BY key, id` (or `key DESC, id DESC`).
+
+    Non-null keys use a row comparison, which Postgres turns into a single
+    range scan on a (key, id) btree index. NULL keys sort last ascending and
+    first descending, so both directions are exact reverses of that index.
+    """
+    if key is id_col:
+        return id_col < last_id if descending else id_col > last_id
+    nullable = key.expression.nullable
+    if descending:
+        if key_value is None:
+            return or_(key.is_not(None), and_(key.is_(None), id_col < last_id))
+        return tuple_(key, id_col) < tuple_(key_value, last_id)
+    if key_value is None:
+        return and_(key.is_(None), id_col > last_id)
+    after = tuple_(key, id_col) > tuple_(key_value, last_id)
+    return or_(after, key.is_(None)) if nullable else after
@@ -0,0 +1,353 @@
+"""
+Offline scraper benchmark.
+
+Starts a local stub of the store (in a separate process) that serves browse
+and product pages built from `benchmarks/fixtures`, points the scraper at
+it and runs `scrape_and_upsert` end to end against a scratch database.
+
+Run from the repository root (config.yaml is read from the cwd):
+
+    python -m benchmarks.scraper_bench --db-url postgresql+asyncpg://.../epic_games_bench \
+        --games 2000 --concurrency 16 --latency-ms 40 --error-rate 0.02
+
+Reports pages/sec, parse ms per page, upsert rows/sec, peak RSS and
+event-loop lag. Bench games use the `bench-` slug prefix; `--reset` deletes
+them before the run so created/updated counts are comparable.
+"""
+from __future__ import annotations
+import argparse, asyncio, json, multiprocessing, random, statistics, sys, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+FIXTURES = Path(__file__).parent / "fixtures"
+SLUG_PREFIX = "bench-"
+
+
+# =========================
+# Stub store server
+# =========================
+def _game(i: int) -> dict:
+    slug = f"{SLUG_PREFIX}game-{i:06d}"
+    title = f"Bench Game {i}"
+    return {
+        "slug": slug,
+        "title": title,
+        "description": f"{title} is a synthetic benchmark title. " * 8,
+        "release_date": f"20{10 + i % 15:02d}-{1 + i % 12:02d}-{1 + i % 28:02d}",
+        "publisher": f"Publisher {i % 40}",
+        "developer": f"Developer {i % 90}",
+        "genres": sorted({["Action", "Adventure", "RPG", "Strategy", "Puzzle"][i % 5], ["Indie", "Shooter"][i % 2]}),
+        "platforms": ["Windows"] if i % 3 else ["Mac OS", "Windows"],
+        "price": 999 + (i % 6) * 1000,
+    }
+
+
+def _offer_state(g: dict) -> dict:
+    tags = [{"name": n, "groupName": "genre"} for n in g["genres"]]
+    tags += [{"name": n, "groupName": "platform"} for n in g["platforms"]]
+    offer = {
+        "title": g["title"],
+        "productSlug": g["slug"],
+        "description": g["description"],
+        "releaseDate": g["release_date"] + "T15:00:00.000Z",
+        "seller": {"name": g["publisher"]},
+        "developerDisplayName": g["developer"],
+        "publisherDisplayName": g["publisher"],
+        "tags": tags,
+        "price": {"totalPrice": {"originalPrice": g["price"], "discountPrice": g["price"], "currencyCode": "USD"}},
+        "promotions": {"promotionalOffers": []},
+    }
+    return {"queries": [{"queryKey": ["getCatalogOffer"], "state": {"data": {"Catalog": {"catalogOffer": offer}}}}]}
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    opts: dict = {}
+    templates: dict = {}
+    counters: dict = {}
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str = "text/html; charset=utf-8", headers: dict | None = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+        counter = self.counters["ok" if status == 200 else "errors"]
+        with counter.get_lock():
+            counter.value += 1
+
+    def do_GET(self) -> None:
+        opts = self.opts
+        latency = opts["latency_ms"] / 1000.0
+        if latency:
+            time.sleep(max(0.0, random.gauss(latency, latency * opts["jitter"])))
+        if random.random() < opts["error_rate"]:
+            status = random.choice((429, 500, 503))
+            return self._send(status, b"error", headers={"Retry-After": "0"} if status != 500 else None)
+
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        n_games = opts["games"]
+        if url.path.endswith("/browse"):
+            start = int(query.get("start", ["0"])[0])
+            count = int(query.get("count", ["40"])[0])
+            card = self.templates["card"]
+            cards = "".join(
+                card.replace("{{slug}}", g["slug"]).replace("{{title}}", g["title"])
+                for g in map(_game, range(start, min(n_games, start + count)))
+            )
+            return self._send(200, self.templates["browse"].replace("{{cards}}", cards).encode())
+        if url.path.startswith("/en-US/p/"):
+            slug = url.path.rsplit("/", 1)[-1]
+            try:
+                i = int(slug.rsplit("-", 1)[-1])
+            except ValueError:
+                return self._send(404, b"not found")
+            if not slug.startswith(SLUG_PREFIX) or i >= n_games:
+                return self._send(404, b"not found")
+            g = _game(i)
+            page = self.templates["detail"]
+            for key in ("title", "description", "developer", "publisher", "release_date"):
+                page = page.replace("{{%s}}" % key, str(g[key]))
+            page = page.replace("{{state}}", json.dumps(_offer_state(g)))
+            return self._send(200, page.encode())
+        if url.path == "/catalog":
+            start = int(query.get("start", ["0"])[0])
+            count = int(query.get("count", ["40"])[0])
+            elements = [
+                _offer_state(g)["queries"][0]["state"]["data"]["Catalog"]["catalogOffer"]
+                for g in map(_game, range(start, min(n_games, start + count)))
+            ]
+            body = {"data": {"Catalog": {"searchStore": {"elements": elements, "paging": {"count": count, "total": n_games}}}}}
+            return self._send(200, json.dumps(body).encode(), "application/json")
+        return self._send(404, b"not found")
+
+
+def _load_templates(detail_mode: str) -> dict:
+    detail = (FIXTURES / "detail.html").read_text(encoding="utf-8")
+    if detail_mode == "dom":
+        # بدون JSON جاسازی‌شده تا مسیر fallback روی DOM سنجیده شود
+        detail = "\n".join(l for l in detail.splitlines() if "{{state}}" not in l)
+    return {
+        "browse": (FIXTURES / "browse.html").read_text(encoding="utf-8"),
+        "card": (FIXTURES / "browse_card.html").read_text(encoding="utf-8"),
+        "detail": detail,
+    }
+
+
+def _serve(port_queue, opts: dict, ok, errors) -> None:
+    _StubHandler.opts = opts
+    _StubHandler.counters = {"ok": ok, "errors": errors}
+    _StubHandler.templates = _load_templates(opts["detail_mode"])
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.daemon_threads = True
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+class StubServer:
+    """The stub store in a child process, so it doesn't compete for our event loop."""
+
+    def __init__(self, opts: dict) -> None:
+        self.ok = multiprocessing.Value("i", 0)
+        self.errors = multiprocessing.Value("i", 0)
+        port_queue = multiprocessing.Queue()
+        self.proc = multiprocessing.Process(target=_serve, args=(port_queue, opts, self.ok, self.errors), daemon=True)
+        self.proc.start()
+        self.url = f"http://127.0.0.1:{port_queue.get(timeout=10)}"
+
+    def stop(self) -> None:
+        self.proc.terminate()
+        self.proc.join()
+
+
+# =========================
+# Measurements
+# =========================
+class LoopLagMonitor:
+    """Samples how late a periodic sleep wakes up, i.e. event-loop blocking."""
+
+    def __init__(self, interval: float = 0.01) -> None:
+        self.interval = interval
+        self.samples: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - started - self.interval))
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    def summary(self) -> dict:
+        if not self.samples:
+            return {"max_ms": 0.0, "p99_ms": 0.0, "mean_ms": 0.0}
+        ordered = sorted(self.samples)
+        return {
+            "max_ms": round(ordered[-1] * 1000, 2),
+            "p99_ms": round(ordered[int(len(ordered) * 0.99) - 1 if len(ordered) > 1 else 0] * 1000, 2),
+            "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        }
+
+
+def measure_parse(detail_mode: str, iterations: int) -> dict:
+    from app.services.parsers import parse_browse_html, parse_detail_html
+
+    templates = _load_templates(detail_mode)
+    cards = "".join(
+        templates["card"].replace("{{slug}}", g["slug"]).replace("{{title}}", g["title"])
+        for g in map(_game, range(40))
+    )
+    browse = templates["browse"].replace("{{cards}}", cards)
+    g = _game(1)
+    detail = templates["detail"]
+    for key in ("title", "description", "developer", "publisher", "release_date"):
+        detail = detail.replace("{{%s}}" % key, str(g[key]))
+    detail = detail.replace("{{state}}", json.dumps(_offer_state(g)))
+
+    def per_call_ms(fn, page: str) -> float:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            fn(page)
+        return round((time.perf_counter() - started) * 1000 / iterations, 3)
+
+    return {"browse_ms": per_call_ms(parse_browse_html, browse), "detail_ms": per_call_ms(parse_detail_html, detail)}
+
+
+def _maxrss_mb(who: str) -> float | None:
+    if resource is None:
+        return None
+    rss = resource.getrusage(getattr(resource, who)).ru_maxrss
+    # لینوکس کیلوبایت و macOS بایت گزارش می‌دهد
+    return round(rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024, 1)
+
+
+# =========================
+# Driver
+# =========================
+async def run_scrape(args: argparse.Namespace, stub: StubServer) -> dict:
+    from sqlalchemy import delete
+
+    from app.db.schema import init_schema
+    from app.db.session import AsyncSessionLocal, engine
+    from app.models import Game
+    from app.services.parse_pool import shutdown_parse_pool
+    from app.services.scraper import scrape_and_upsert
+
+    async with engine.begin() as conn:
+        await init_schema(conn)
+    if args.reset:
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(Game).where(Game.slug.startswith(SLUG_PREFIX)))
+            await session.commit()
+
+    monitor = LoopLagMonitor()
+    progress: dict = {}
+    monitor.start()
+    started = time.perf_counter()
+    try:
+        async with AsyncSessionLocal() as session:
+            result = await scrape_and_upsert(session, all_pages=True, progress=progress)
+    finally:
+        elapsed = time.perf_counter() - started
+        await monitor.stop()
+        shutdown_parse_pool()
+        await engine.dispose()
+
+    pages = stub.ok.value
+    upsert_seconds = progress.get("upsert_seconds") or 0.0
+    return {
+        "result": result,
+        "elapsed_s": round(elapsed, 3),
+        "pages": pages,
+        "upstream_errors": stub.errors.value,
+        "pages_per_s": round(pages / elapsed, 1) if elapsed else 0.0,
+        "items_per_s": round(result["total"] / elapsed, 1) if elapsed else 0.0,
+        "upsert_rows_per_s": round(result["total"] / upsert_seconds, 1) if upsert_seconds else None,
+        "event_loop_lag": monitor.summary(),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db-url", required=True, help="scratch database URL (bench rows are written to it)")
+    parser.add_argument("--games", type=int, default=500)
+    parser.add_argument("--page-size", type=int, default=40)
+    parser.add_argument("--source", choices=("html", "json_catalog"), default="html")
+    parser.add_argument("--detail-mode", choices=("json", "dom"), default="json", help="serve embedded page JSON or DOM only")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--parse-workers", type=int, default=None)
+    parser.add_argument("--rps", type=float, default=200.0, help="initial and max rate-limiter rate")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter", type=float, default=0.25, help="latency stddev as a fraction of the mean")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--parse-iterations", type=int, default=200)
+    parser.add_argument("--cache", action="store_true", help="keep the on-disk HTTP cache enabled")
+    parser.add_argument("--reset", action="store_true", help="delete bench- games before running")
+    parser.add_argument("--json", dest="json_out", help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    stub = StubServer({
+        "games": args.games,
+        "latency_ms": args.latency_ms,
+        "jitter": args.jitter,
+        "error_rate": args.error_rate,
+        "detail_mode": args.detail_mode,
+    })
+    try:
+        from app.core.config import settings
+
+        settings.database.url = args.db_url
+        cfg = settings.scraper
+        cfg.base_url = stub.url
+        cfg.browse_path = "/en-US/browse"
+        cfg.source = args.source
+        cfg.catalog_url = "/catalog"
+        cfg.catalog_params = {}
+        cfg.browse_page_size = cfg.catalog_page_size = args.page_size
+        cfg.concurrency = args.concurrency
+        cfg.rate_limit_rps = cfg.rate_limit_max_rps = args.rps
+        cfg.max_pages = args.games // args.page_size + 2
+        if args.parse_workers is not None:
+            cfg.parse_workers = args.parse_workers
+        if not args.cache:
+            cfg.cache_dir = None
+
+        report = {
+            "config": {k: v for k, v in vars(args).items() if k not in ("db_url", "json_out")},
+            "parse": measure_parse(args.detail_mode, args.parse_iterations),
+            **asyncio.run(run_scrape(args, stub)),
+            # parse workers are children; they count once the pool has been shut down
+            "peak_rss_mb": {"main": _maxrss_mb("RUSAGE_SELF"), "children": _maxrss_mb("RUSAGE_CHILDREN")},
+        }
+    finally:
+        stub.stop()
+
+    text = json.dumps(report, indent=2, default=str)
+    print(text)
+    if args.json_out:
+        Path(args.json_out).write_text(text + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
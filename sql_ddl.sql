@@ -1,72 +1,141 @@
--- database name : epic_games --
-
-
--- 1) publishers
-CREATE TABLE IF NOT EXISTS publishers (
-  id SERIAL PRIMARY KEY,
-  name VARCHAR(255) UNIQUE NOT NULL,
-  website TEXT,
-  created_at TIMESTAMPTZ DEFAULT NOW()
-);
-
--- 2) developers
-CREATE TABLE IF NOT EXISTS developers (
-  id SERIAL PRIMARY KEY,
-  name VARCHAR(255) UNIQUE NOT NULL,
-  website TEXT,
-  created_at TIMESTAMPTZ DEFAULT NOW()
-);
-
--- 3) genres
-CREATE TABLE IF NOT EXISTS genres (
-  id SERIAL PRIMARY KEY,
-  name VARCHAR(128) UNIQUE NOT NULL
-);
-
--- 4) platforms
-CREATE TABLE IF NOT EXISTS platforms (
-  id SERIAL PRIMARY KEY,
-  name VARCHAR(128) UNIQUE NOT NULL
-);
-
--- 5) games
-CREATE TABLE IF NOT EXISTS games (
-  id SERIAL PRIMARY KEY,
-  slug VARCHAR(255) UNIQUE NOT NULL,
-  title VARCHAR(255) NOT NULL,
-  description TEXT,
-  release_date DATE,
-  publisher_id INT REFERENCES publishers(id) ON DELETE SET NULL,
-  developer_id INT REFERENCES developers(id) ON DELETE SET NULL,
-  created_at TIMESTAMPTZ DEFAULT NOW()
-);
-
-CREATE INDEX IF NOT EXISTS idx_games_publisher_id ON games(publisher_id);
-CREATE INDEX IF NOT EXISTS idx_games_developer_id ON games(developer_id);
-
--- 6) price_offers (قیمت/تخفیف لحظه‌ای)
-CREATE TABLE IF NOT EXISTS price_offers (
-  id SERIAL PRIMARY KEY,
-  game_id INT NOT NULL REFERENCES games(id) ON DELETE CASCADE,
-  original_price_cents INT,
-  discounted_price_cents INT,
-  currency VARCHAR(8) DEFAULT 'USD',
-  starts_at TIMESTAMPTZ,
-  ends_at TIMESTAMPTZ,
-  scraped_at TIMESTAMPTZ DEFAULT NOW()
-);
-CREATE INDEX IF NOT EXISTS idx_price_offers_game_id ON price_offers(game_id);
-
--- 7) game_genres (M2M)
-CREATE TABLE IF NOT EXISTS game_genres (
-  game_id INT NOT NULL REFERENCES games(id) ON DELETE CASCADE,
-  genre_id INT NOT NULL REFERENCES genres(id) ON DELETE CASCADE,
-  PRIMARY KEY (game_id, genre_id)
-);
-
--- 8) game_platforms (M2M)
-CREATE TABLE IF NOT EXISTS game_platforms (
-  game_id INT NOT NULL REFERENCES games(id) ON DELETE CASCADE,
-  platform_id INT NOT NULL REFERENCES platforms(id) ON DELETE CASCADE,
-  PRIMARY KEY (game_id, platform_id)
-);
+-- database name : epic_games --
+
+
+-- 1) publishers
+CREATE TABLE IF NOT EXISTS publishers (
+  id SERIAL PRIMARY KEY,
+  name VARCHAR(255) UNIQUE NOT NULL,
+  website TEXT,
+  created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- 2) developers
+CREATE TABLE IF NOT EXISTS developers (
+  id SERIAL PRIMARY KEY,
+  name VARCHAR(255) UNIQUE NOT NULL,
+  website TEXT,
+  created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- 3) genres
+CREATE TABLE IF NOT EXISTS genres (
+  id SERIAL PRIMARY KEY,
+  name VARCHAR(128) UNIQUE NOT NULL
+);
+
+-- 4) platforms
+CREATE TABLE IF NOT EXISTS platforms (
+  id SERIAL PRIMARY KEY,
+  name VARCHAR(128) UNIQUE NOT NULL
+);
+
+-- 5) games
+CREATE TABLE IF NOT EXISTS games (
+  id SERIAL PRIMARY KEY,
+  slug VARCHAR(255) UNIQUE NOT NULL,
+  title VARCHAR(255) NOT NULL,
+  description TEXT,
+  release_date DATE,
+  publisher_id INT REFERENCES publishers(id) ON DELETE SET NULL,
+  developer_id INT REFERENCES developers(id) ON DELETE SET NULL,
+  content_hash VARCHAR(64),
+  last_scraped_at TIMESTAMPTZ,
+  last_changed_at TIMESTAMPTZ,
+  created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- upgrade path for databases created before change detection
+ALTER TABLE games ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+ALTER TABLE games ADD COLUMN IF NOT EXISTS last_scraped_at TIMESTAMPTZ;
+ALTER TABLE games ADD COLUMN IF NOT EXISTS last_changed_at TIMESTAMPTZ;
+
+-- جستجو (/games/search): full-text + trigram
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+ALTER TABLE games ADD COLUMN IF NOT EXISTS search_vector TSVECTOR GENERATED ALWAYS AS (
+  setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+  setweight(to_tsvector('english', coalesce(description, '')), 'B')
+) STORED;
+CREATE INDEX IF NOT EXISTS ix_games_search_vector ON games USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS ix_games_title_trgm ON games USING GIN (title gin_trgm_ops);
+
+-- keyset pagination روی /games: (کلید مرتب‌سازی, id) و فیلترها
+CREATE INDEX IF NOT EXISTS ix_games_title_id ON games(title, id);
+CREATE INDEX IF NOT EXISTS ix_games_release_date_id ON games(release_date, id);
+CREATE INDEX IF NOT EXISTS ix_games_publisher_id_id ON games(publisher_id, id);
+CREATE INDEX IF NOT EXISTS ix_games_developer_id_id ON games(developer_id, id);
+
+CREATE INDEX IF NOT EXISTS idx_games_publisher_id ON games(publisher_id);
+CREATE INDEX IF NOT EXISTS idx_games_developer_id ON games(developer_id);
+
+-- 6) price_offers (تاریخچهٔ قیمت؛ فقط وقتی قیمت یا بازهٔ تخفیف عوض شود ردیف جدید)
+-- پارتیشن ماهانه روی scraped_at؛ پارتیشن‌های ماه‌های بعد را اپ در استارتاپ می‌سازد
+-- (app/db/partitions.py). مهاجرت از جدول قدیمی بدون پارتیشن، به همین ترتیب:
+-- 1) جدول قدیمی و sequence و کلید اصلی‌اش را rename کنید (وگرنه CREATE زیر با "already exists" خطا می‌دهد):
+--   ALTER TABLE price_offers RENAME TO price_offers_legacy;
+--   ALTER SEQUENCE price_offers_id_seq RENAME TO price_offers_legacy_id_seq;
+--   ALTER INDEX price_offers_pkey RENAME TO price_offers_legacy_pkey;
+-- 2) این فایل را اجرا کنید.
+-- 3) پیش از انتقال داده، پارتیشن ماهانهٔ همهٔ ماه‌های تاریخچه را بسازید تا ردیف‌ها در DEFAULT نمانند:
+--   DO $$
+--   DECLARE m date;
+--   BEGIN
+--     FOR m IN SELECT generate_series(date_trunc('month', COALESCE(min(scraped_at), now())), date_trunc('month', now()), interval '1 month')::date
+--              FROM price_offers_legacy LOOP
+--       EXECUTE format('CREATE TABLE IF NOT EXISTS %I PARTITION OF price_offers FOR VALUES FROM (%L) TO (%L)',
+--                      'price_offers_' || to_char(m, 'YYYY_MM'), m, (m + interval '1 month')::date);
+--     END LOOP;
+--   END $$;
+-- 4) داده را منتقل کنید:
+--   INSERT INTO price_offers (game_id, original_price_cents, discounted_price_cents, currency, starts_at, ends_at, scraped_at)
+--   SELECT game_id, original_price_cents, discounted_price_cents, currency, starts_at, ends_at, COALESCE(scraped_at, NOW())
+--   FROM price_offers_legacy;
+-- (اگر ردیفی در price_offers_default بماند، ensure_price_partitions هنگام ساختن پارتیشن آن ماه منتقلش می‌کند.)
+CREATE TABLE IF NOT EXISTS price_offers (
+  id BIGSERIAL,
+  scraped_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  game_id INT NOT NULL REFERENCES games(id) ON DELETE CASCADE,
+  original_price_cents INT,
+  discounted_price_cents INT,
+  currency VARCHAR(8) DEFAULT 'USD',
+  starts_at TIMESTAMPTZ,
+  ends_at TIMESTAMPTZ,
+  PRIMARY KEY (id, scraped_at)
+) PARTITION BY RANGE (scraped_at);
+CREATE TABLE IF NOT EXISTS price_offers_default PARTITION OF price_offers DEFAULT;
+CREATE INDEX IF NOT EXISTS ix_price_offers_game_scraped ON price_offers(game_id, scraped_at);
+CREATE INDEX IF NOT EXISTS ix_price_offers_scraped_at_brin ON price_offers USING BRIN (scraped_at);
+
+-- 6b) game_price_summaries (تجمیع هر بازی؛ بعد از ثبت هر تغییر قیمت بازسازی می‌شود)
+-- برای پر کردن اولیه از تاریخچهٔ موجود: refresh_price_summaries(session) در app/services/prices.py
+CREATE TABLE IF NOT EXISTS game_price_summaries (
+  game_id INT PRIMARY KEY REFERENCES games(id) ON DELETE CASCADE,
+  currency VARCHAR(8) NOT NULL DEFAULT 'USD',
+  current_price_cents INT,
+  original_price_cents INT,
+  offer_starts_at TIMESTAMPTZ,
+  offer_ends_at TIMESTAMPTZ,
+  lowest_price_cents INT,
+  lowest_price_at TIMESTAMPTZ,
+  closed_discount_seconds DOUBLE PRECISION NOT NULL DEFAULT 0,
+  closed_seconds DOUBLE PRECISION NOT NULL DEFAULT 0,
+  changes INT NOT NULL DEFAULT 0,
+  first_seen_at TIMESTAMPTZ,
+  last_changed_at TIMESTAMPTZ,
+  refreshed_at TIMESTAMPTZ
+);
+
+-- 7) game_genres (M2M)
+CREATE TABLE IF NOT EXISTS game_genres (
+  game_id INT NOT NULL REFERENCES games(id) ON DELETE CASCADE,
+  genre_id INT NOT NULL REFERENCES genres(id) ON DELETE CASCADE,
+  PRIMARY KEY (game_id, genre_id)
+);
+CREATE INDEX IF NOT EXISTS ix_game_genres_genre_id_game_id ON game_genres(genre_id, game_id);
+
+-- 8) game_platforms (M2M)
+CREATE TABLE IF NOT EXISTS game_platforms (
+  game_id INT NOT NULL REFERENCES games(id) ON DELETE CASCADE,
+  platform_id INT NOT NULL REFERENCES platforms(id) ON DELETE CASCADE,
+  PRIMARY KEY (game_id, platform_id)
+);
+CREATE INDEX IF NOT EXISTS ix_game_platforms_platform_id_game_id ON game_platforms(platform_id, game_id);
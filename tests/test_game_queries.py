@@ -0,0 +1,115 @@
+"""
+Keyset pagination of /games (keyset_page + next_cursor) against SQLite.
+
+    python -m pytest tests/test_game_queries.py
+"""
+import asyncio
+from datetime import date
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.db.schema import init_schema
+from app.models import Game
+from app.services.game_queries import keyset_page, next_cursor
+from app.utils.pagination import decode_cursor, encode_cursor
+
+# عنوان‌ها و تاریخ‌های تکراری (و NULL) تا id به‌عنوان tie-breaker لازم شود
+GAMES = [
+    ("Beta", date(2021, 5, 1)),
+    ("Alpha", None),
+    ("Beta", date(2020, 1, 1)),
+    ("Alpha", date(2021, 5, 1)),
+    ("Gamma", None),
+    ("Beta", date(2021, 5, 1)),
+    ("Alpha", date(2020, 1, 1)),
+]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'games'}.db")
+
+    async def seed() -> None:
+        async with engine.begin() as conn:
+            await init_schema(conn)
+        async with AsyncSession(engine) as session:
+            session.add_all(Game(slug=f"g{i}", title=t, release_date=d) for i, (t, d) in enumerate(GAMES))
+            await session.commit()
+
+    asyncio.run(seed())
+    yield engine
+    asyncio.run(engine.dispose())
+
+
+def _page(engine, sort, order, cursor, limit):
+    async def run():
+        async with AsyncSession(engine) as session:
+            return (await session.execute(keyset_page(select(Game), sort, order, cursor, limit))).scalars().all()
+
+    return asyncio.run(run())
+
+
+def _walk(engine, sort, order, limit=2) -> list[Game]:
+    seen, cursor = [], None
+    while True:
+        rows = _page(engine, sort, order, cursor, limit)
+        seen.extend(rows[:limit])
+        cursor = next_cursor(rows, sort, order, limit)
+        if cursor is None:
+            return seen
+
+
+def _expected(games: list[Game], sort: str, order: str) -> list[int]:
+    # NULL آخرِ صعودی و اولِ نزولی؛ نزولی دقیقاً برعکس صعودی است
+    ordered = sorted(games, key=lambda g: (getattr(g, sort) is None, getattr(g, sort) or 0, g.id))
+    ids = [g.id for g in ordered]
+    return ids[::-1] if order == "desc" else ids
+
+
+@pytest.mark.parametrize("order", ["asc", "desc"])
+@pytest.mark.parametrize("sort", ["title", "release_date", "id"])
+def test_pages_cover_every_row_once_in_order(engine, sort, order):
+    everything = _page(engine, "id", "asc", None, len(GAMES))
+    walked = _walk(engine, sort, order)
+
+    assert [g.id for g in walked] == _expected(everything, sort, order)
+
+
+def test_last_page_has_no_cursor(engine):
+    rows = _page(engine, "title", "asc", None, len(GAMES))
+    assert len(rows) == len(GAMES)
+    assert next_cursor(rows, "title", "asc", len(GAMES)) is None
+
+
+def _cursor_after_first_page(engine, sort="title", order="asc") -> dict:
+    rows = _page(engine, sort, order, None, 2)
+    return decode_cursor(next_cursor(rows, sort, order, 2))
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", "bm90IGpzb24", encode_cursor([1, 2]), encode_cursor({})])
+def test_malformed_cursor_is_rejected(engine, cursor):
+    with pytest.raises(ValueError):
+        _page(engine, "title", "asc", cursor, 2)
+
+
+@pytest.mark.parametrize("change", [{"s": "release_date"}, {"o": "desc"}, {"i": "3"}, {"i": None}])
+def test_cursor_for_another_sort_or_tampered_id_is_rejected(engine, change):
+    pos = _cursor_after_first_page(engine)
+    with pytest.raises(ValueError):
+        _page(engine, "title", "asc", encode_cursor({**pos, **change}), 2)
+
+
+@pytest.mark.parametrize("sort, key", [
+    ("title", 5),
+    ("title", ["Beta"]),
+    ("release_date", {"y": 2021}),
+    ("release_date", "not-a-date"),
+    ("id", "3"),
+    ("id", None),
+])
+def test_cursor_key_of_the_wrong_type_is_rejected(engine, sort, key):
+    pos = _cursor_after_first_page(engine, sort)
+    with pytest.raises(ValueError):
+        _page(engine, sort, "asc", encode_cursor({**pos, "k": key}), 2)
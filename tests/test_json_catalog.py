@@ -0,0 +1,107 @@
+"""
+JsonCatalogSource against a stub catalog served through httpx.MockTransport.
+
+    python -m pytest tests/test_json_catalog.py
+"""
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.services import fetcher
+from app.services.sources import JsonCatalogSource
+
+GAMES = 5
+PAGE_SIZE = 2
+
+
+def _offer(i: int) -> dict:
+    return {
+        "title": f"Game {i}",
+        "productSlug": f"game-{i}",
+        "description": f"Game {i} description",
+        "releaseDate": "2020-01-02T15:00:00.000Z",
+        "seller": {"name": "Publisher"},
+        "developerDisplayName": "Developer",
+        "tags": [{"name": "RPG", "groupName": "genre"}, {"name": "Windows", "groupName": "platform"}],
+        "price": {"totalPrice": {"originalPrice": 1999, "discountPrice": 999, "currencyCode": "USD"}},
+    }
+
+
+class StubCatalog:
+    """Serves GAMES offers at /catalog, paged by count/start; `with_total=False` drops the paging block."""
+
+    def __init__(self, with_total: bool = True) -> None:
+        self.with_total = with_total
+        self.requests: list[httpx.URL] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request.url)
+        if request.url.path != "/catalog":
+            return httpx.Response(404)
+        start, count = int(request.url.params["start"]), int(request.url.params["count"])
+        store = {"elements": [_offer(i) for i in range(start, min(GAMES, start + count))]}
+        if self.with_total:
+            store["paging"] = {"count": count, "total": GAMES}
+        return httpx.Response(200, text=json.dumps({"data": {"Catalog": {"searchStore": store}}}))
+
+
+@pytest.fixture(autouse=True)
+def scraper_settings(monkeypatch):
+    cfg = settings.scraper
+    monkeypatch.setattr(cfg, "base_url", "http://json-catalog.test")
+    monkeypatch.setattr(cfg, "catalog_url", "/catalog")
+    monkeypatch.setattr(cfg, "catalog_page_size", PAGE_SIZE)
+    monkeypatch.setattr(cfg, "max_pages", 10)
+    monkeypatch.setattr(cfg, "rate_limit_rps", 1000.0)
+    # بدون process pool و بدون cache دیسکی
+    monkeypatch.setattr(cfg, "parse_workers", 0)
+    monkeypatch.setattr(cfg, "cache_dir", None)
+    monkeypatch.setattr(fetcher, "_http_cache", None)
+
+
+def _collect(stub: StubCatalog, all_pages: bool) -> list[dict]:
+    async def run() -> list[dict]:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(stub), base_url=settings.scraper.base_url) as client:
+            return [item async for item in JsonCatalogSource().iter_items(client, all_pages=all_pages)]
+
+    return asyncio.run(run())
+
+
+def test_items_are_parsed_complete():
+    stub = StubCatalog()
+    items = _collect(stub, all_pages=False)
+
+    assert [i["slug"] for i in items] == ["game-0", "game-1"]
+    assert items[0] == {
+        "slug": "game-0",
+        "title": "Game 0",
+        "description": "Game 0 description",
+        "release_date": "2020-01-02",
+        "publisher": "Publisher",
+        "developer": "Developer",
+        "genres": ["RPG"],
+        "platforms": ["Windows"],
+        "price": {"original_cents": 1999, "discounted_cents": 999, "currency": "USD", "starts_at": None, "ends_at": None},
+    }
+    (url,) = stub.requests
+    assert (url.params["count"], url.params["start"], url.params["locale"]) == (str(PAGE_SIZE), "0", "en-US")
+
+
+def test_paging_stops_at_total():
+    stub = StubCatalog()
+    items = _collect(stub, all_pages=True)
+
+    assert [i["slug"] for i in items] == [f"game-{i}" for i in range(GAMES)]
+    # 0, 2, 4: بعد از آن start >= total است و درخواست دیگری نمی‌رود
+    assert [u.params["start"] for u in stub.requests] == ["0", "2", "4"]
+
+
+def test_paging_stops_at_empty_page_without_total():
+    stub = StubCatalog(with_total=False)
+    items = _collect(stub, all_pages=True)
+
+    assert len(items) == GAMES
+    assert [u.params["start"] for u in stub.requests] == ["0", "2", "4", "6"]
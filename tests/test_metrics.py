@@ -0,0 +1,55 @@
+"""
+Route labels of `http_request_duration_seconds` when ResponseCacheMiddleware
+answers without reaching the router.
+
+    python -m pytest tests/test_metrics.py
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.config import ResponseCacheSettings
+from app.services.metrics import MetricsMiddleware, registry
+from app.services.response_cache import ResponseCache, ResponseCacheMiddleware
+
+
+def _count(method: str, route: str, status: int) -> int:
+    prefix = f'http_request_duration_seconds_count{{method="{method}",route="{route}",status="{status}"}} '
+    for line in registry.render().splitlines():
+        if line.startswith(prefix):
+            return int(line[len(prefix):])
+    return 0
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(ResponseCacheMiddleware, cache=ResponseCache(ResponseCacheSettings(backend="memory")))
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/api/metrics-test/{gid}")
+    async def read(gid: int):
+        return {"id": gid}
+
+    with TestClient(app) as client:
+        yield client
+
+
+def test_cache_hits_and_304_keep_the_route_template(client):
+    route = "/api/metrics-test/{gid}"
+    before = _count("GET", route, 200), _count("GET", route, 304), _count("GET", "unmatched", 200)
+
+    miss = client.get("/api/metrics-test/7")
+    hit = client.get("/api/metrics-test/7")
+    not_modified = client.get("/api/metrics-test/7", headers={"If-None-Match": miss.headers["etag"]})
+
+    assert (miss.headers["x-cache"], hit.headers["x-cache"]) == ("MISS", "HIT")
+    assert not_modified.status_code == 304
+    after = _count("GET", route, 200), _count("GET", route, 304), _count("GET", "unmatched", 200)
+    assert (after[0] - before[0], after[1] - before[1], after[2] - before[2]) == (2, 1, 0)
+
+
+def test_unknown_path_is_unmatched(client):
+    before = _count("GET", "unmatched", 404)
+    assert client.get("/api/nope").status_code == 404
+    assert _count("GET", "unmatched", 404) == before + 1
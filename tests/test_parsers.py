@@ -0,0 +1,34 @@
+"""
+Offer parsing shared by the HTML detail pages and the JSON catalog.
+
+    python -m pytest tests/test_parsers.py
+"""
+from app.services.parsers import parse_offer
+
+
+def _offer(promotional_offers: list) -> dict:
+    return {
+        "price": {"totalPrice": {"originalPrice": 1999, "discountPrice": 999, "currencyCode": "EUR"}},
+        "promotions": {"promotionalOffers": promotional_offers},
+    }
+
+
+def test_price_window_is_the_first_active_promo():
+    offer = _offer([
+        {"promotionalOffers": []},
+        {"promotionalOffers": [
+            {"startDate": "2024-01-01T00:00:00.000Z", "endDate": "2024-01-08T00:00:00.000Z"},
+            {"startDate": "2024-02-01T00:00:00.000Z", "endDate": "2024-02-08T00:00:00.000Z"},
+        ]},
+        {"promotionalOffers": [{"startDate": "2024-03-01T00:00:00.000Z", "endDate": "2024-03-08T00:00:00.000Z"}]},
+    ])
+
+    price = parse_offer(offer)["price"]
+
+    assert (price["starts_at"], price["ends_at"]) == ("2024-01-01T00:00:00.000Z", "2024-01-08T00:00:00.000Z")
+    assert (price["original_cents"], price["discounted_cents"], price["currency"]) == (1999, 999, "EUR")
+
+
+def test_price_without_promotions_has_no_window():
+    price = parse_offer(_offer([]))["price"]
+    assert (price["starts_at"], price["ends_at"]) == (None, None)
@@ -0,0 +1,99 @@
+"""
+Read/write split against three SQLite files: a primary and two replicas.
+
+    pip install -r requirements-dev.txt
+    python -m pytest tests        # from the repo root (config.yaml is read from the cwd)
+"""
+import asyncio
+import importlib
+import time
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.config import settings
+from app.db.schema import init_schema
+from app.models import Genre
+
+
+async def _seed(url: str, name: str) -> None:
+    # هر فایل یک ژانر با نام خودش دارد تا معلوم شود پاسخ از کدام دیتابیس آمده
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await init_schema(conn)
+    async with AsyncSession(engine) as session:
+        session.add(Genre(name=name))
+        await session.commit()
+    await engine.dispose()
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    urls = {name: f"sqlite+aiosqlite:///{tmp_path / name}.db" for name in ("primary", "replica1", "replica2")}
+    for name, url in urls.items():
+        asyncio.run(_seed(url, name))
+    monkeypatch.setattr(settings.database, "url", urls["primary"])
+    monkeypatch.setattr(settings.database, "replica_urls", [urls["replica1"], urls["replica2"]])
+    monkeypatch.setattr(settings.database, "read_your_writes_s", 5.0)
+    # engineها هنگام import از settings ساخته می‌شوند
+    session = importlib.reload(importlib.import_module("app.db.session"))
+    yield session
+    monkeypatch.undo()
+    importlib.reload(session)
+
+
+@pytest.fixture
+def client(db):
+    app = FastAPI()
+    app.add_middleware(db.PrimaryPinMiddleware)
+
+    @app.get("/genres")
+    async def read(session: AsyncSession = Depends(db.get_read_session)):
+        return (await session.execute(select(Genre.name).order_by(Genre.id))).scalars().all()
+
+    @app.post("/genres")
+    async def write(name: str, session: AsyncSession = Depends(db.get_session)):
+        session.add(Genre(name=name))
+        await session.commit()
+        return {"name": name}
+
+    @app.post("/genres/through-read-session")
+    async def write_through_read(name: str, session: AsyncSession = Depends(db.get_read_session)):
+        session.add(Genre(name=name))
+        await session.commit()
+
+    with TestClient(app) as c:
+        yield c
+
+
+def test_reads_round_robin_across_replicas(client):
+    assert [client.get("/genres").json() for _ in range(4)] == [["replica1"], ["replica2"], ["replica1"], ["replica2"]]
+
+
+def test_reads_after_write_are_pinned_to_primary(client, db):
+    resp = client.post("/genres", params={"name": "new"})
+    assert resp.status_code == 200
+    assert db.PIN_COOKIE in resp.cookies
+    assert [client.get("/genres").json() for _ in range(3)] == [["primary", "new"]] * 3
+
+    client.cookies.clear()
+    assert client.get("/genres").json() in (["replica1"], ["replica2"])
+
+
+def test_expired_pin_is_ignored(client, db):
+    client.cookies.set(db.PIN_COOKIE, "1")
+    assert [client.get("/genres").json() for _ in range(2)] == [["replica1"], ["replica2"]]
+
+
+def test_read_sessions_reject_writes(client, db):
+    # replica
+    with pytest.raises(OperationalError):
+        client.post("/genres/through-read-session", params={"name": "nope"})
+    # primary (pinned client; also what GET routes get when no replicas are configured)
+    client.cookies.set(db.PIN_COOKIE, str(time.time() + 60))
+    with pytest.raises(OperationalError):
+        client.post("/genres/through-read-session", params={"name": "nope"})